@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Compare WebScraper.clean_content against the selector-based cleaner it replaced.
+
+    python benchmarks/clean_content_bench.py [page.html] [--repeat N] [--scale N]
+
+The page (scraped_content.html by default) is also tested with --scale
+synthetic article cards, navigation and ad blocks appended to its body, so
+the cost on a large listing page shows up too.
+Both cleaners must keep the same tags and text for the timings to count.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from utils.web_scraper import WebScraper  # noqa: E402
+
+LEGACY_SELECTORS = [
+    'header', 'footer', '.header', '.footer', '#header', '#footer',
+    'nav', '.nav', '#nav', '.navigation', '#navigation', '.menu', '#menu',
+    '.sidebar', '#sidebar', '.advertisement', '.ads',
+    '[role="banner"]', '[role="contentinfo"]',
+    '.site-header', '.site-footer', '#site-header', '#site-footer',
+    'script', 'style', 'noscript', 'iframe', 'meta', 'link'
+]
+
+
+def legacy_clean(soup):
+    cleaned_soup = BeautifulSoup(str(soup), 'html.parser')
+    if cleaned_soup.head:
+        cleaned_soup.head.decompose()
+    for selector in LEGACY_SELECTORS:
+        for element in cleaned_soup.select(selector):
+            element.decompose()
+    body_content = cleaned_soup.find('body')
+    if body_content:
+        new_soup = BeautifulSoup('<div></div>', 'html.parser')
+        new_soup.div.append(body_content)
+        return new_soup.div
+    return cleaned_soup
+
+
+def legacy_clean_and_minify(soup):
+    minified = ' '.join(str(legacy_clean(soup)).split())
+    minified = minified.replace('> <', '><').replace(' >', '>').replace('< ', '<')
+    return BeautifulSoup(minified, 'html.parser')
+
+
+def signature(node):
+    """Tags in document order plus whitespace-normalized text, from body down."""
+    node = node.find('body') or node
+    return [tag.name for tag in node.find_all(True)], ' '.join(node.get_text(' ').split())
+
+
+LISTING_CARD = """
+    <div class="menu"><a href="/">Home</a> <a href="/blog">Blog</a></div>
+    <article class="card">
+        <h2>  <a href="/post-{n}">Post number {n}</a>  </h2>
+        <img src="/images/{n}.png" alt="cover">
+        <p>
+            A short    description of post {n},
+            spread over   several lines.
+        </p>
+        <script>track({n});</script>
+    </article>
+    <aside class="ads"><iframe src="/ad/{n}"></iframe></aside>
+"""
+
+
+def enlarge(html, scale):
+    soup = BeautifulSoup(html, 'html.parser')
+    body = soup.find('body')
+    if body is None:
+        body = soup.new_tag('body')
+        (soup.find('html') or soup).append(body)
+    cards = ''.join(LISTING_CARD.format(n=n) for n in range(scale))
+    body.append(BeautifulSoup(f'<header><nav>Site</nav></header><main>{cards}</main>'
+                              '<footer role="contentinfo">Footer</footer>', 'html.parser'))
+    return str(soup)
+
+
+def best_of(func, html, repeat):
+    """Best time per call, parsing included, as in fetch_content."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(BeautifulSoup(html, 'html.parser'))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('page', nargs='?', default=str(ROOT / 'scraped_content.html'))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--scale', type=int, default=50)
+    args = parser.parse_args()
+
+    scraper = WebScraper(None)
+    html = Path(args.page).read_text(encoding='utf-8')
+    cases = [
+        ('clean', legacy_clean, lambda soup: scraper.clean_content(soup, inplace=True)),
+        ('clean+minify', legacy_clean_and_minify,
+         lambda soup: scraper.clean_and_minify_content(soup, inplace=True)),
+    ]
+
+    for label, page in (('page', html), (f'page x{args.scale}', enlarge(html, args.scale))):
+        print(f'{label}: {len(page) / 1024:.1f} KB')
+        for name, legacy, current in cases:
+            if signature(legacy(BeautifulSoup(page, 'html.parser'))) != \
+                    signature(current(BeautifulSoup(page, 'html.parser'))):
+                sys.exit(f'  {name}: output differs from the legacy cleaner')
+            old = best_of(legacy, page, args.repeat)
+            new = best_of(current, page, args.repeat)
+            print(f'  {name:<13} legacy {old * 1000:8.2f} ms   single pass {new * 1000:8.2f} ms   '
+                  f'{old / new:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Compare two result files written by benchmarks/run.py.
+
+    python benchmarks/compare.py old.json new.json [--threshold 10]
+
+Medians are compared benchmark by benchmark. One that got slower by more
+than --threshold percent is flagged, and the exit status is 1 if any was.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('old', type=Path)
+    parser.add_argument('new', type=Path)
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent slowdown of the median reported as a regression')
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    print(f'old: {old["meta"].get("commit")} ({old["meta"].get("created_at")})')
+    print(f'new: {new["meta"].get("commit")} ({new["meta"].get("created_at")})')
+
+    names = [name for name in new['results'] if name in old['results']]
+    width = max(map(len, names), default=0)
+    regressions = 0
+    for name in names:
+        before = old['results'][name]['median_ms']
+        after = new['results'][name]['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif change < -args.threshold:
+            flag = '  faster'
+        print(f'{name:<{width}}  {before:10.3f} -> {after:10.3f} ms  {change:+7.1f}%{flag}')
+
+    for label, only in (('only in old', set(old['results']) - set(new['results'])),
+                        ('only in new', set(new['results']) - set(old['results']))):
+        if only:
+            print(f'{label}: {", ".join(sorted(only))}')
+
+    print(f'{regressions} regression(s) above {args.threshold:g}%')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Deterministic fixtures for the benchmarks: feeds, pages and article databases.
+
+Everything is generated from a fixed seed, so two runs (and two commits)
+measure the same inputs without touching the network.
+"""
+
+import functools
+import random
+import threading
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+SEED = 20240101
+WORDS = ('laravel php python release framework database queue cache testing package '
+         'performance security update tutorial livewire eloquent migration api '
+         'deploy server cloud docker async streaming parser index query').split()
+SOURCES = [f'news{i}.example.com' for i in range(20)]
+
+# Bump when the generated database changes, so cached copies are rebuilt
+DB_FORMAT_VERSION = 2
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def rss_feed(rng, base_url, items):
+    entries = []
+    for i in range(items):
+        title = escape(f'{_sentence(rng, 6)} {i}')
+        description = escape(f'<p><img src="{base_url}/images/{i}.png" alt=""> {_sentence(rng, 40)}</p>')
+        entries.append(f"""
+    <item>
+      <title>{title}</title>
+      <link>{base_url}/posts/{i}</link>
+      <guid>{base_url}/posts/{i}</guid>
+      <pubDate>{formatdate(1_700_000_000 - i * 3600, usegmt=True)}</pubDate>
+      <description>{description}</description>
+    </item>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+  <channel>
+    <title>Fixture feed</title>
+    <link>{base_url}</link>{''.join(entries)}
+  </channel>
+</rss>
+"""
+
+
+def atom_feed(rng, base_url, items):
+    entries = []
+    for i in range(items):
+        title = escape(f'{_sentence(rng, 6)} {i}')
+        content = escape(f'<div><p>{_sentence(rng, 20)}</p><img src="{base_url}/images/{i}.jpg"><p>{_sentence(rng, 20)}</p></div>')
+        entries.append(f"""
+  <entry>
+    <title>{title}</title>
+    <link href="{base_url}/entries/{i}"/>
+    <id>{base_url}/entries/{i}</id>
+    <updated>2023-11-{(i % 28) + 1:02d}T10:00:00Z</updated>
+    <summary type="html">{content}</summary>
+  </entry>""")
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Fixture feed</title>
+  <id>{base_url}</id>
+  <updated>2023-11-28T10:00:00Z</updated>{''.join(entries)}
+</feed>
+"""
+
+
+def html_page(rng, feed_path):
+    """A blog page whose feed is found through discovery."""
+    articles = ''.join(
+        f'<article class="card"><h2><a href="/p/{i}">{_sentence(rng, 6)}</a></h2><p>{_sentence(rng, 30)}</p></article>'
+        for i in range(30)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><title>Blog</title>
+<link rel="alternate" type="application/rss+xml" href="{feed_path}">
+<script>var analytics = true;</script></head>
+<body><header><nav>Home Blog About</nav></header><main>{articles}</main><footer>Footer</footer></body></html>
+"""
+
+
+def write_fixture_site(directory, feeds=20, items=50):
+    """
+    Write feeds (RSS and Atom alternating) and one discovery page per feed.
+
+    Returns:
+        Paths of the pages, relative to directory, in a fixed order
+    """
+    rng = random.Random(SEED)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    pages = []
+    for n in range(feeds):
+        base_url = f'https://{SOURCES[n % len(SOURCES)]}/{n}'
+        if n % 2:
+            name, body = f'feed{n}.atom', atom_feed(rng, base_url, items)
+        else:
+            name, body = f'feed{n}.rss', rss_feed(rng, base_url, items)
+        (directory / name).write_text(body, encoding='utf-8')
+        (directory / f'blog{n}.html').write_text(html_page(rng, f'/{name}'), encoding='utf-8')
+        pages.append(f'blog{n}.html')
+    return pages
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves a directory over HTTP on a free localhost port, in a background thread."""
+
+    def __init__(self, directory):
+        handler = functools.partial(_QuietHandler, directory=str(directory))
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def build_article_db(path, size, batch_size=20000):
+    """
+    Create an Articles database at path holding size synthetic articles.
+
+    About 30% are read, 5% favorites and 5% linked as duplicates of the
+    previous article, spread over the SOURCES hosts. Each batch is added to
+    the search index in the same transaction, as save_articles does.
+    The file is built under a temporary name and only renamed when complete.
+    """
+    from database.db_connection import get_pool
+    from models.article_model import Articles
+
+    path = Path(path)
+    partial = path.with_name(path.name + '.partial')
+    for leftover in path.parent.glob(partial.name + '*'):
+        leftover.unlink()
+
+    articles = Articles(str(partial))
+    rng = random.Random(SEED + size)
+    for start in range(1, size + 1, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, size + 1)):
+            source = SOURCES[i % len(SOURCES)]
+            rows.append((
+                f'{_sentence(rng, 7)} #{i}',
+                f'<p>{_sentence(rng, 35)}</p>',
+                f'https://{source}/posts/{i}',
+                f'https://{source}/images/{i}.png',
+                source,
+                int(rng.random() < 0.3),
+                int(rng.random() < 0.05),
+                i - 1 if i > 1 and rng.random() < 0.05 else None,
+            ))
+        with articles.db.transaction() as con:
+            con.executemany("""
+                INSERT INTO articles
+                (title, description, url, primary_image, source, is_read, is_favorite, duplicate_of)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            Articles.index_articles(con, start - 1)
+    articles.db.execute('ANALYZE')
+    articles.close_conn()
+    # The last connection to close checkpoints the WAL into the main file
+    get_pool(str(partial)).close_all()
+    partial.replace(path)
+    return path
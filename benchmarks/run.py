@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the ingest and read paths.
+
+    python benchmarks/run.py [--sizes 10000 100000 1000000] [--output results.json]
+    python benchmarks/compare.py old.json new.json
+
+Nothing touches the network: feeds and pages are generated from a fixed seed
+and served from a local HTTP server, and article databases are synthetic.
+Databases are cached in --cache-dir by size, since the 1M one takes a while
+to build. Every benchmark records its timings in milliseconds under a stable
+name, so result files from two commits can be compared.
+"""
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / 'src'))
+
+from clean_content_bench import enlarge  # noqa: E402
+from fixtures import (DB_FORMAT_VERSION, FixtureServer, build_article_db,  # noqa: E402
+                      write_fixture_site)
+
+from handlers.feed_fetcher import (FeedCache, _collect_articles,  # noqa: E402
+                                   _feedparser_entries, _parse_feed)
+from handlers.scraping_handler import handle_scraping  # noqa: E402
+from models.article_cache import query_cache  # noqa: E402
+from models.article_model import Articles  # noqa: E402
+from models.link_model import Links  # noqa: E402
+from utils.web_scraper import WebScraper  # noqa: E402
+
+TABS = (None, 'read', 'favorites')
+PAGES = (1, 10, 100)
+PER_PAGE = 10
+
+
+def summarize(samples, **extra):
+    """Timings in seconds to a result entry in milliseconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
+    return {
+        'median_ms': statistics.median(ordered) * 1000,
+        'p95_ms': p95 * 1000,
+        'min_ms': ordered[0] * 1000,
+        'runs': len(ordered),
+        **extra,
+    }
+
+
+def measure(func, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_read_path(results, db_path, size, repeat):
+    """get_filtered_articles per tab, page depth and duplicate collapsing, cold and warm."""
+    articles = Articles(str(db_path))
+    try:
+        for tab in TABS:
+            for collapse in (False, True):
+                suffix = f'{tab or "all"}{"/collapsed" if collapse else ""}'
+                results[f'read/{size}/count/{suffix}'] = summarize(measure(
+                    lambda: articles.get_total_filtered_articles(tab, collapse),
+                    repeat, setup=query_cache.clear))
+                for page in PAGES:
+                    def load():
+                        articles.get_filtered_articles(page, PER_PAGE, tab, collapse_duplicates=collapse)
+                    name = f'read/{size}/page{page}/{suffix}'
+                    results[f'{name}/cold'] = summarize(measure(load, repeat, setup=query_cache.clear))
+                    results[f'{name}/warm'] = summarize(measure(load, repeat))
+    finally:
+        articles.close_conn()
+
+
+def bench_ingest(results, site_url, pages, repeat):
+    """
+    handle_scraping over the fixture site into a fresh database.
+
+    The first pass discovers every feed and stores all of its entries; the
+    second pass repeats it with the stored feed caches, as a scheduled
+    refresh does, and is answered with 304s.
+    """
+    urls = [f'{site_url}/{page}' for page in pages]
+    first, second = [], []
+    inserted = 0
+    for run in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = str(Path(directory) / f'ingest{run}.db')
+            links_model, articles_model = Links(db_path), Articles(db_path)
+            try:
+                links_model.sync_links(urls)
+                for samples in (first, second):
+                    started = time.perf_counter()
+                    counts = [count for _, count, _ in handle_scraping(urls, links_model, articles_model)]
+                    samples.append(time.perf_counter() - started)
+                    if samples is first:
+                        inserted = sum(counts)
+            finally:
+                links_model.close_conn()
+                articles_model.close_conn()
+
+    results['ingest/first_pass'] = summarize(
+        first, sources=len(urls), articles=inserted,
+        articles_per_second=inserted / statistics.median(first))
+    results['ingest/refresh_pass'] = summarize(second, sources=len(urls))
+
+
+def bench_feed_parse(results, site_directory, site_url, repeat):
+    """
+    _parse_feed on downloaded RSS and Atom fixtures, without any network time,
+    next to the feedparser path it falls back to.
+    """
+    for kind, pattern in (('rss', '*.rss'), ('atom', '*.atom')):
+        feed = sorted(Path(site_directory).glob(pattern))[0]
+        response = requests.get(f'{site_url}/{feed.name}', timeout=10)
+        response.raise_for_status()
+        entries = len(_parse_feed(response, None, FeedCache(), None)['articles'])
+        extra = {'entries': entries, 'kilobytes': len(response.content) / 1024}
+        results[f'parse/{kind}'] = summarize(
+            measure(lambda: _parse_feed(response, None, FeedCache(), None), repeat), **extra)
+        results[f'parse/{kind}/feedparser'] = summarize(measure(
+            lambda: _collect_articles(_feedparser_entries(response), response.url, None, FeedCache(), None),
+            repeat), **extra)
+
+
+def bench_clean_content(results, repeat, scale):
+    """WebScraper.clean_content on the recorded page, alone and as a large listing page."""
+    scraper = WebScraper(None)
+    html = (ROOT.parent / 'scraped_content.html').read_text(encoding='utf-8')
+    for label, page in (('page', html), (f'page_x{scale}', enlarge(html, scale))):
+        for name, clean in (('clean', lambda soup: scraper.clean_content(soup, inplace=True)),
+                            ('clean_minify', lambda soup: scraper.clean_and_minify_content(soup, inplace=True))):
+            results[f'clean_content/{label}/{name}'] = summarize(
+                measure(lambda: clean(BeautifulSoup(page, 'html.parser')), repeat),
+                kilobytes=len(page) / 1024)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Article counts of the synthetic databases')
+    parser.add_argument('--output', type=Path, default=ROOT / 'results' / 'latest.json')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per read, parse and clean benchmark')
+    parser.add_argument('--ingest-repeat', type=int, default=3, help='Runs of the ingest benchmark')
+    parser.add_argument('--feeds', type=int, default=20, help='Fixture feeds to ingest')
+    parser.add_argument('--items', type=int, default=50, help='Entries per fixture feed')
+    parser.add_argument('--scale', type=int, default=50, help='Listing cards added for the large clean_content page')
+    parser.add_argument('--cache-dir', type=Path, default=ROOT / '.cache',
+                        help='Where synthetic databases are kept between runs')
+    parser.add_argument('--only', nargs='+', choices=['read', 'ingest', 'parse', 'clean'],
+                        default=['read', 'ingest', 'parse', 'clean'])
+    args = parser.parse_args()
+
+    results = {}
+    started = time.perf_counter()
+
+    if 'read' in args.only:
+        args.cache_dir.mkdir(parents=True, exist_ok=True)
+        for size in args.sizes:
+            db_path = args.cache_dir / f'articles-{size}-v{DB_FORMAT_VERSION}.db'
+            if not db_path.exists():
+                print(f'Building {size:,} article database...', flush=True)
+                build_started = time.perf_counter()
+                build_article_db(db_path, size)
+                print(f'  built in {time.perf_counter() - build_started:.1f}s', flush=True)
+            print(f'Read path on {size:,} articles', flush=True)
+            bench_read_path(results, db_path, size, args.repeat)
+
+    with tempfile.TemporaryDirectory() as site_directory:
+        pages = write_fixture_site(site_directory, feeds=args.feeds, items=args.items)
+        with FixtureServer(site_directory) as server:
+            if 'ingest' in args.only:
+                print(f'Ingest of {args.feeds} feeds x {args.items} entries', flush=True)
+                bench_ingest(results, server.url, pages, args.ingest_repeat)
+            if 'parse' in args.only:
+                print('Feed parsing', flush=True)
+                bench_feed_parse(results, site_directory, server.url, args.repeat)
+
+    if 'clean' in args.only:
+        print('clean_content', flush=True)
+        bench_clean_content(results, args.repeat, args.scale)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'args': {key: (str(value) if isinstance(value, Path) else value)
+                     for key, value in vars(args).items()},
+            'seconds': time.perf_counter() - started,
+        },
+        'results': results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    width = max(map(len, results), default=0)
+    for name, result in results.items():
+        print(f'{name:<{width}}  {result["median_ms"]:10.3f} ms  (p95 {result["p95_ms"]:.3f})')
+    print(f'Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
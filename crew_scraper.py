@@ -1,20 +1,37 @@
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from bs4 import NavigableString, Tag
 from crewai import LLM, Agent, Crew, Task
 
 from web_scraper import WebScraper
 
-content_extractor = Agent(
-    role="HTML Content Extractor",
-    goal="""
-        extract important topic, that seems like articles from html code, extract should include title, description and link
-    """,
-    backstory="""
-    •	A data-focused web content analyzer, trained to recognize common web structures and extract the main content of interest.
-	•	Developed with the purpose of isolating significant information (titles, descriptions, links, images) from cluttered HTML, making it easy for the next agent to organize this data.
-    """,
-    allow_delegation=False,
-    verbose=False,
-    llm=LLM(model="ollama/llama3.1:8b", base_url="http://localhost:11434")
-)
+# Point OLLAMA_BASE_URL at a stub server to run this without a real model
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "ollama/llama3.1:8b")
+
+# Prompt budget per chunk, leaving room in llama3.1's context for the
+# instructions and the answer
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", "3000"))
+MAX_WORKERS = int(os.getenv("CHUNK_MAX_WORKERS", "4"))
+
+def create_extractor():
+    return Agent(
+        role="HTML Content Extractor",
+        goal="""
+            extract important topic, that seems like articles from html code, extract should include title, description and link
+        """,
+        backstory="""
+        •	A data-focused web content analyzer, trained to recognize common web structures and extract the main content of interest.
+    	•	Developed with the purpose of isolating significant information (titles, descriptions, links, images) from cluttered HTML, making it easy for the next agent to organize this data.
+        """,
+        allow_delegation=False,
+        verbose=False,
+        llm=LLM(model=OLLAMA_MODEL, base_url=OLLAMA_BASE_URL)
+    )
 
 # data_origanizer = Agent(
 #     role="Content Organizer and Tagging Agent",
@@ -30,34 +47,151 @@ content_extractor = Agent(
 #     allow_delegation=False
 # )
 
-def create_task(content):
+def create_task(content, agent):
     return Task(
         name="Get published articles",
         description=f"""
-            I want to extract what seems to be important articles in the below html
+            I want to extract what seems to be important articles in the below html.
+            The html is one part of a larger page, ignore anything cut off at its edges.
 
             {content}
         """,
-        agent=content_extractor,
-        expected_output="list titles",
-
+        agent=agent,
+        expected_output="""
+            A JSON array of objects with "title", "description" and "link" keys,
+            and nothing else. An empty array if there are no articles.
+        """,
     )
 
+def estimate_tokens(text):
+    """Rough token count, about 4 characters per token for English HTML"""
+    return len(text) // 4 + 1
+
+def chunk_content(content, token_budget=CHUNK_TOKEN_BUDGET):
+    """
+    Split cleaned HTML into chunks that fit the token budget
+
+    Chunks end on element boundaries. An element that is too big on its own
+    is split between its children, and only text that is too big on its own
+    is cut mid-way.
+
+    Args:
+        content: Element returned by WebScraper.fetch_content
+        token_budget (int): Maximum estimated tokens per chunk
+
+    Returns:
+        List of HTML strings
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(''.join(current))
+        current = []
+        current_tokens = 0
+
+    def add(node):
+        nonlocal current_tokens
+        html = str(node)
+        tokens = estimate_tokens(html)
+        if tokens > token_budget:
+            if isinstance(node, Tag) and node.contents:
+                for child in node.contents:
+                    add(child)
+            else:
+                flush()
+                size = token_budget * 4
+                chunks.extend(html[i:i + size] for i in range(0, len(html), size))
+            return
+        if current_tokens + tokens > token_budget:
+            flush()
+        current.append(html)
+        current_tokens += tokens
+
+    for node in content.contents if isinstance(content, Tag) else [content]:
+        if isinstance(node, NavigableString) and not node.strip():
+            continue
+        add(node)
+    flush()
+    return chunks
+
+def parse_articles(output):
+    """Article records from a model answer, tolerating text around the JSON"""
+    match = re.search(r'\[.*\]', str(output), re.DOTALL)
+    if not match:
+        return []
+    try:
+        records = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return []
+    return [
+        {
+            "title": str(record.get("title") or "").strip(),
+            "description": str(record.get("description") or "").strip(),
+            "link": str(record.get("link") or "").strip(),
+        }
+        for record in records
+        if isinstance(record, dict) and (record.get("title") or record.get("link"))
+    ]
+
+def extract_chunk(chunk):
+    # Each chunk gets its own agent, crews are not shared across threads
+    agent = create_extractor()
+    crew = Crew(agents=[agent], tasks=[create_task(chunk, agent)])
+    return parse_articles(crew.kickoff())
+
+def merge_articles(batches):
+    """Merge chunk results, dropping repeats of the same link (or title without one)"""
+    merged = {}
+    for articles in batches:
+        for article in articles:
+            key = article["link"].rstrip('/').lower() or article["title"].lower()
+            if key not in merged:
+                merged[key] = article
+            elif len(article["description"]) > len(merged[key]["description"]):
+                # An article cut across two chunks keeps its fuller description
+                merged[key] = {**merged[key], "description": article["description"]}
+    return list(merged.values())
+
+def extract_articles(content, token_budget=CHUNK_TOKEN_BUDGET, max_workers=MAX_WORKERS):
+    """
+    Extract articles from cleaned HTML, one model call per chunk
+
+    Args:
+        content: Element returned by WebScraper.fetch_content
+        token_budget (int): Maximum estimated tokens per chunk
+        max_workers (int): Maximum concurrent model calls
+
+    Returns:
+        Deduplicated list of {"title", "description", "link"} dicts, in page order
+    """
+    chunks = chunk_content(content, token_budget)
+    if not chunks:
+        return []
+
+    results = [[] for _ in chunks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = {executor.submit(extract_chunk, chunk): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Error extracting chunk {futures[future] + 1}/{len(chunks)}: {e}")
+    return merge_articles(results)
+
 def main():
-    web_scraper = WebScraper('https://laravel-news.com/blog')
+    url = sys.argv[1] if len(sys.argv) > 1 else 'https://laravel-news.com/blog'
+    web_scraper = WebScraper(url)
     # Fetch and clean content
     content = web_scraper.fetch_content(clean=True, minify=True)
+    if content is None:
+        return
 
-    # print(content)
-
-    task = create_task(content);
-
-    crew = Crew(
-        agents=[content_extractor],
-        tasks=[task]
-    )
+    articles = extract_articles(content)
+    print(json.dumps(articles, indent=2))
 
-    result = crew.kickoff()
-    print(result)
 if __name__ == "__main__":
     main()
@@ -1,10 +1,9 @@
 import streamlit as st
 
-from handlers.scraping_handler import handle_scraping
 from models.article_model import Articles
 from models.link_model import Links
-from ui.components import (display_articles, setup_article_styles,
-                           setup_page_style)
+from ui.components import (display_articles, display_diagnostics,
+                           setup_article_styles, setup_page_style)
 
 st.set_page_config(
     layout="wide",
@@ -25,25 +24,31 @@ def main():
         # Setup scraping interface in sidebar
         with st.sidebar:
             st.header("Scraping Interface")
-            links = [link[0] for link in links_model.get_all_links()]
-            links_input = st.text_area('Links to scrape', value='\n'.join(links))
+            links = links_model.get_all_links()
+            links_input = st.text_area('Links to scrape', value='\n'.join(link[0] for link in links))
 
-            if st.button(label='Find RSS Feeds', type='secondary'):
-                links_model.clear_links()
+            if st.button(label='Save Links', type='secondary'):
                 urls = [url.strip() for url in links_input.split('\n') if url.strip()]
+                # Keep rows of links that are still listed so their feed cache survives
+                links_model.sync_links(urls)
+                st.rerun()
 
-                if urls:
-                    handle_scraping(urls, links_model, articles_model)
-                else:
-                    st.warning("Please enter some URLs to check for RSS feeds")
-
+            # Articles are fetched by the refresh daemon; the UI only reads them
+            last_refresh = max((str(link[2]) for link in links if link[2]), default=None)
+            st.caption(
+                f"Sources are refreshed in the background by `python -m refresh_daemon` (run from `src/`)."
+                f" Last refresh: {last_refresh[:16] if last_refresh else 'never'}."
+            )
 
             st.divider()  # Add a visual separator
             if st.button("Integrate Medium", icon=":material/article:"):
                 st.info("Medium integration functionality to be implemented")
 
+            with st.expander("Diagnostics"):
+                display_diagnostics()
+
         # Display articles with pagination
-        display_articles()
+        display_articles(articles_model)
 
     finally:
         links_model.close_conn()
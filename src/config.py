@@ -1,5 +1,73 @@
 from pathlib import Path
 
+# Data files live under the repository root whatever the working directory,
+# so the UI and the refresh daemon share them
+DATA_DIR = Path(__file__).resolve().parent.parent / 'db'
+
 # Database configuration
-DB_PATH = Path('db/topics.sqlite')
-DB_TIMEOUT = 30
\ No newline at end of file
+DB_PATH = DATA_DIR / 'topics.sqlite'
+DB_TIMEOUT = 30
+
+# Ingestion configuration
+INGEST_MAX_WORKERS = 8  # Sources fetched at the same time
+INGEST_PER_HOST_LIMIT = 2  # Sources fetched at the same time from one host
+REQUEST_TIMEOUT = 10
+FEED_DISCOVERY_TTL = 7 * 24 * 3600  # Seconds a discovered feed URL (or its absence) is trusted
+
+# SQLite connection tuning
+DB_POOL_SIZE = 8  # Idle connections kept for reuse per database
+DB_CACHE_SIZE_KB = 64 * 1024  # Page cache per connection
+DB_MMAP_SIZE = 256 * 1024 * 1024
+
+# Article query cache
+ARTICLE_CACHE_SIZE = 512  # Cached pages and counts kept in memory
+ARTICLE_CACHE_TTL = 300  # Seconds; bounds staleness from writers in other processes
+
+# Headless browser scraping
+SCRAPER_BROWSER_CONTEXTS = 4  # Pages rendered in parallel
+SCRAPER_DEFAULT_WAIT = 'domcontentloaded'  # 'load', 'domcontentloaded', 'networkidle' or 'selector:<css>'
+SCRAPER_SOURCE_WAITS = {}  # Per-host overrides, e.g. {'x.com': 'selector:article'}
+SCRAPER_WAIT_TIMEOUT = 30000  # Milliseconds
+SCRAPER_RUN_TIMEOUT = 120  # Seconds a caller waits for a page, queueing for a context included
+
+# Full-text search
+SEARCH_CANDIDATES = 1000  # Newest matches ranked per query; bounds latency on very common terms
+
+# Background refresh daemon
+REFRESH_INTERVAL = 3600  # Seconds between refreshes of a source without its own interval
+REFRESH_JITTER = 0.1  # Random +/- fraction applied to each interval
+REFRESH_TICK = 60  # Seconds between checks for due sources
+
+# LLM response cache
+LLM_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached completion is reused
+LLM_CACHE_MAX_ENTRIES = 2000  # Least recently used completions beyond this are evicted
+
+# Article bodies used as LLM context
+ARTICLE_BODY_MAX_CHARS = 100_000  # Extracted text stored per article
+ARTICLE_BODY_PROMPT_CHARS = 12_000  # Part of the body put in the system prompt
+
+# Content recommendations
+RECOMMENDER_CONTEXT_SIZE = 12  # Articles shown to the model
+RECOMMENDER_PER_SOURCE = 3  # Most articles taken from one source
+RECOMMENDER_CANDIDATES = 500  # Newest articles (and favorites) the sample is drawn from
+
+# Near-duplicate detection
+DUPLICATE_MAX_DISTANCE = 3  # Differing SimHash bits still counted as the same story (below 4 keeps lookups exact)
+DUPLICATE_BATCH_SIZE = 5000  # Articles fingerprinted per batch
+
+# Latency metrics
+METRICS_SLOW_QUERY_MS = 100  # Queries at least this slow are logged
+METRICS_SLOW_LOG_SIZE = 100  # Slow queries kept for the diagnostics panel
+METRICS_EXPORT_PATH = DATA_DIR / 'metrics.json'  # .json for JSON, anything else for Prometheus text
+
+# Local image thumbnails, served by Streamlit from src/static (enableStaticServing)
+THUMBNAIL_DIR = Path(__file__).resolve().parent / 'static' / 'thumbs'
+THUMBNAIL_URL_PREFIX = 'app/static/thumbs'
+THUMBNAIL_SIZE = (640, 480)  # Bounding box in pixels; cards are about a third of a wide page
+THUMBNAIL_QUALITY = 80  # JPEG quality
+THUMBNAIL_MAX_DISK_BYTES = 200 * 1024 * 1024  # Least recently used thumbnails beyond this are evicted
+THUMBNAIL_MAX_SOURCE_BYTES = 15 * 1024 * 1024  # Larger images are not downloaded
+THUMBNAIL_WORKERS = 4  # Images downloaded at the same time
+THUMBNAIL_RETRY_AFTER = 24 * 3600  # Seconds before an image that failed is tried again
+THUMBNAIL_BATCH_SIZE = 200  # Most new articles' thumbnails queued per refresh daemon pass
+THUMBNAIL_PASS_TIMEOUT = 60  # Seconds the daemon waits for them before going on
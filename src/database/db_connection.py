@@ -1,19 +1,186 @@
 import sqlite3
-from typing import List, Tuple, Any
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_POOL_SIZE, DB_TIMEOUT
+from utils.metrics import metrics
+
+# SQL functions available on every pooled connection: name -> (num_params, func)
+_functions: Dict[str, Tuple[int, Callable]] = {}
+_functions_version = 0
+
+
+def register_function(name: str, num_params: int, func: Callable) -> None:
+    """
+    Make a deterministic Python function callable from SQL on every pooled
+    connection, including ones that are already open.
+
+    Triggers that call it only work for writers that registered it too.
+    """
+    global _functions_version
+    _functions[name] = (num_params, func)
+    _functions_version += 1
+
+
+class _PooledConnection(sqlite3.Connection):
+    functions_version = -1
+
+    def apply_functions(self) -> None:
+        version = _functions_version
+        for name, (num_params, func) in list(_functions.items()):
+            self.create_function(name, num_params, func, deterministic=True)
+        self.functions_version = version
+
+
+class ConnectionPool:
+    """
+    Hands out one SQLite connection per thread for a single database file.
+
+    Connections are opened in WAL mode with the busy timeout applied, so
+    readers don't block the writer and concurrent writers wait instead of
+    failing with "database is locked". A thread keeps its connection until it
+    releases it; released connections stay idle (up to max_idle) and are
+    handed to the next thread that asks, which matters for Streamlit where
+    every rerun runs on a new thread.
+    """
+
+    def __init__(self, db_path: str, max_idle: int = DB_POOL_SIZE) -> None:
+        self.db_path = str(db_path)
+        self.max_idle = max_idle
+        self._local = threading.local()
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> _PooledConnection:
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            with self._lock:
+                con = self._idle.pop() if self._idle else None
+            if con is None:
+                con = self._connect()
+            self._local.con = con
+        if con.functions_version != _functions_version:
+            con.apply_functions()
+        return con
+
+    def release(self) -> None:
+        """Give the calling thread's connection back to the pool."""
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            return
+        self._local.con = None
+        if con.in_transaction:
+            con.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(con)
+                return
+        con.close()
+
+    def close_all(self) -> None:
+        self.release()
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for con in idle:
+            con.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Connections move between threads through the idle list, but only
+        # one thread holds a given connection at a time
+        con = sqlite3.connect(self.db_path, timeout=DB_TIMEOUT, check_same_thread=False,
+                              factory=_PooledConnection)
+        con.execute(f'PRAGMA busy_timeout = {int(DB_TIMEOUT * 1000)}')
+        con.execute('PRAGMA journal_mode = WAL')
+        con.execute('PRAGMA synchronous = NORMAL')
+        con.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+        con.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+        con.execute('PRAGMA temp_store = MEMORY')
+        return con
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Return the process-wide pool for a database file, creating it on first use."""
+    key = str(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key)
+        return pool
+
 
 class DatabaseConnection:
     def __init__(self, db_name: str) -> None:
         self.db_name = db_name
-        self.con = sqlite3.connect(db_name)
-        self.cursor = self.con.cursor()
+        self.pool = get_pool(db_name)
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        return self.pool.connection()
 
     def execute(self, query: str, params: Tuple[Any, ...] = ()) -> None:
-        self.cursor.execute(query, params)
-        self.con.commit()
+        started = time.perf_counter()
+        con = self.con
+        con.execute(query, params)
+        con.commit()
+        metrics.observe_query(query, 'execute', time.perf_counter() - started)
 
-    def fetch_all(self, query: str, params: Tuple[Any, ...] = ()) -> List[Tuple]:
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Run several statements on the connection and commit them together.
+
+        With immediate, the write lock is taken up front, so what the
+        transaction reads before its first write can't change under it.
+        """
+        con = self.con
+        with con:
+            if immediate and not con.in_transaction:
+                con.execute('BEGIN IMMEDIATE')
+            yield con
+
+    def execute_many(self, query: str, seq_of_params: Iterable[Tuple[Any, ...]]) -> int:
+        """
+        Run a statement for every parameter tuple inside a single transaction.
+
+        Args:
+            query: SQL query string
+            seq_of_params: Parameter tuples, one per execution
+
+        Returns:
+            Total number of rows modified
+        """
+        started = time.perf_counter()
+        with self.con:
+            cursor = self.con.executemany(query, seq_of_params)
+        metrics.observe_query(query, 'execute_many', time.perf_counter() - started)
+        return cursor.rowcount
+
+    def fetch_all(self, query: str, params: Tuple[Any, ...] = (),
+                  row_factory: Optional[Callable[[sqlite3.Cursor, Tuple], Any]] = None) -> List[Any]:
+        started = time.perf_counter()
+        cursor = self.con.cursor()
+        cursor.row_factory = row_factory
+        rows = cursor.execute(query, params).fetchall()
+        metrics.observe_query(query, 'fetch_all', time.perf_counter() - started)
+        return rows
+
+    def iterate(self, query: str, params: Tuple[Any, ...] = (), batch_size: int = 10000) -> Iterator[Tuple]:
+        """Yield rows in batches instead of loading the whole result set."""
+        cursor = self.con.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
 
     def fetch_one(self, query: str, parameters: tuple = ()) -> tuple:
         """
@@ -26,11 +193,32 @@ class DatabaseConnection:
         Returns:
             Single row as tuple or None if no results
         """
-        cursor = self.con.cursor()
-        cursor.execute(query, parameters)
+        started = time.perf_counter()
+        cursor = self.con.execute(query, parameters)
         result = cursor.fetchone()
         cursor.close()
+        metrics.observe_query(query, 'fetch_one', time.perf_counter() - started)
         return result
 
+    def ensure_columns(self, table: str, columns: Dict[str, str]) -> List[str]:
+        """
+        Add any of the given columns that an existing table is missing.
+
+        Args:
+            table: Table name
+            columns: Column name to column definition (e.g. 'TEXT NULL')
+
+        Returns:
+            Names of the columns that were added
+        """
+        existing = {row[1] for row in self.fetch_all(f'PRAGMA table_info({table})')}
+        added = []
+        for name, definition in columns.items():
+            if name not in existing:
+                self.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                added.append(name)
+        return added
+
     def close(self) -> None:
-        self.con.close()
\ No newline at end of file
+        """Release this thread's connection back to the shared pool."""
+        self.pool.release()
\ No newline at end of file
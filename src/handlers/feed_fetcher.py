@@ -0,0 +1,238 @@
+import calendar
+import codecs
+import hashlib
+import logging
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+
+import feedparser
+import requests
+
+from config import REQUEST_TIMEOUT
+from handlers.feed_parser import FeedParseError, first_image, iter_entries
+from scrapper import scrapper_articles
+from utils.metrics import stage
+from utils.seen_urls import SeenUrls
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+FEED_TYPES = ['application/rss+xml', 'application/atom+xml', 'application/feed+xml']
+
+
+@dataclass
+class FeedCache:
+    """What is remembered about a link's feed between runs."""
+    rss_link: Optional[str] = None
+    discovery_fresh: bool = False  # rss_link was looked up within FEED_DISCOVERY_TTL
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    last_entry_at: Optional[int] = None  # Publish time of the newest entry seen (Unix seconds)
+    last_entry_guid: Optional[str] = None  # Guid of the newest entry seen
+
+
+def is_feed_url(url: str) -> bool:
+    return any(feed_type in url for feed_type in ['rss', 'atom', 'feed'])
+
+
+class _FeedLinkParser(HTMLParser):
+    """Incremental scan for a feed <link>, remembering the first feed-like <a> on the way."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.feed_href: Optional[str] = None
+        self.anchor_href: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'link' and self.feed_href is None:
+            attrs = dict(attrs)
+            if attrs.get('type') in FEED_TYPES:
+                self.feed_href = attrs.get('href') or ''
+        elif tag == 'a' and self.anchor_href is None:
+            href = dict(attrs).get('href') or ''
+            if 'feed' in href or 'rss' in href or 'atom' in href:
+                self.anchor_href = href
+
+
+def find_feed_urls(url: str) -> Optional[str]:
+    """
+    Discover the feed of a page.
+
+    The page is parsed while it streams in and the download stops as soon as
+    a feed <link> turns up, which is normally inside <head>. Only pages
+    without one are read to the end for a feed-looking anchor.
+    """
+    parser = _FeedLinkParser()
+    with requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT, stream=True) as response:
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        for chunk in response.iter_content(chunk_size=8192):
+            parser.feed(decoder.decode(chunk))
+            if parser.feed_href is not None:
+                return urljoin(url, parser.feed_href)
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+
+    href = parser.feed_href if parser.feed_href is not None else parser.anchor_href
+    return urljoin(url, href) if href is not None else None
+
+
+def extract_picture_links(entry: dict, base_url: str = '') -> List[str]:
+    picture_links = [entry.get('media_content', [{}])[0].get('url', '')] if 'media_content' in entry else []
+    if not picture_links:
+        src = first_image(entry.get('description', ''))
+        if src is not None:
+            picture_links = [urljoin(base_url, src)]
+    return picture_links
+
+
+def fetch_feed(url: str, cache: Optional[FeedCache] = None) -> tuple:
+    """
+    Download a feed with a conditional GET.
+
+    Args:
+        url: Feed URL
+        cache: Validators from the previous fetch of the same feed (optional)
+
+    Returns:
+        Tuple of (response or None when unchanged, FeedCache for this fetch)
+    """
+    headers = dict(HEADERS)
+    if cache and cache.etag:
+        headers['If-None-Match'] = cache.etag
+    if cache and cache.last_modified:
+        headers['If-Modified-Since'] = cache.last_modified
+
+    response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304 and cache:
+        return None, cache
+    response.raise_for_status()
+
+    new_cache = FeedCache(
+        rss_link=url,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+        content_hash=hashlib.sha256(response.content).hexdigest(),
+        last_entry_at=cache.last_entry_at if cache else None,
+        last_entry_guid=cache.last_entry_guid if cache else None
+    )
+    # Some servers ignore validators but still serve the same bytes
+    if cache and cache.content_hash == new_cache.content_hash:
+        return None, new_cache
+    return response, new_cache
+
+
+def _entry_timestamp(entry: dict) -> Optional[int]:
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return calendar.timegm(parsed) if parsed else None
+
+
+def scrape_single_url(url: str, source: str, is_feed: bool = False,
+                      cache: Optional[FeedCache] = None,
+                      seen_urls: Optional[SeenUrls] = None) -> dict:
+    """
+    Fetch and parse a single source without touching the UI, so it can run
+    on a worker thread.
+
+    Entries older than the feed's high-water mark, or whose link is already
+    in seen_urls, are dropped before they are turned into articles.
+
+    Args:
+        url: Feed URL, or page URL when is_feed is False
+        source: Host name the articles are attributed to
+        is_feed: Whether url points to an RSS/Atom feed
+        cache: What was stored about this feed on the previous run (optional)
+        seen_urls: URLs of articles already stored (optional)
+
+    Returns:
+        Dict with an 'articles' list, the number of 'skipped' entries and
+        seconds spent per stage in 'timings', plus 'not_modified' and 'cache'
+        for feeds
+    """
+    timings = {}
+    if not is_feed:
+        # The browser loads and extracts in one go
+        with stage(timings, 'fetch'):
+            records = scrapper_articles(url) or {'articles': []}
+        articles = records.get('articles') or []
+        new_articles = [a for a in articles if seen_urls is None or a.get('link') not in seen_urls]
+        return {'articles': new_articles, 'skipped': len(articles) - len(new_articles), 'timings': timings}
+
+    with stage(timings, 'fetch'):
+        response, new_cache = fetch_feed(url, cache)
+    if response is None:
+        return {'articles': [], 'skipped': 0, 'not_modified': True, 'cache': new_cache, 'timings': timings}
+
+    with stage(timings, 'parse'):
+        records = _parse_feed(response, cache, new_cache, seen_urls)
+    records['timings'] = timings
+    return records
+
+
+def _parse_feed(response, cache: Optional[FeedCache], new_cache: FeedCache,
+                seen_urls: Optional[SeenUrls]) -> dict:
+    """
+    Turn a downloaded feed into articles with the streaming parser.
+
+    Feeds it can't read (malformed XML, unusual formats) are parsed again
+    from the start with feedparser, which is slower but far more lenient.
+    """
+    last_entry = (new_cache.last_entry_at, new_cache.last_entry_guid)
+    try:
+        return _collect_articles(iter_entries(response.content, response.url), response.url,
+                                 cache, new_cache, seen_urls)
+    except FeedParseError as e:
+        logger.debug("Falling back to feedparser for %s: %s", response.url, e)
+        new_cache.last_entry_at, new_cache.last_entry_guid = last_entry
+        return _collect_articles(_feedparser_entries(response), response.url,
+                                 cache, new_cache, seen_urls)
+
+
+def _feedparser_entries(response) -> Iterator[Dict[str, Any]]:
+    feed = feedparser.parse(response.content, response_headers={
+        'content-location': response.url,
+        'content-type': response.headers.get('Content-Type', ''),
+    })
+    return iter(feed.entries)
+
+
+def _collect_articles(entries: Iterator[Dict[str, Any]], base_url: str, cache: Optional[FeedCache],
+                      new_cache: FeedCache, seen_urls: Optional[SeenUrls]) -> dict:
+    old_entry_at = cache.last_entry_at if cache else None
+    old_entry_guid = cache.last_entry_guid if cache else None
+    articles = []
+    skipped = 0
+    for index, entry in enumerate(entries):
+        guid = entry.get('id') or entry.get('link')
+        published_at = _entry_timestamp(entry)
+
+        if index == 0 and guid:
+            new_cache.last_entry_guid = guid
+        if published_at is not None:
+            if new_cache.last_entry_at is None or published_at > new_cache.last_entry_at:
+                new_cache.last_entry_at = published_at
+            if old_entry_at is not None and published_at < old_entry_at:
+                skipped += 1
+                continue
+        elif old_entry_guid and guid == old_entry_guid:
+            # Undated feeds list newest first: everything from here on is known
+            skipped += 1 + sum(1 for _ in entries)
+            break
+
+        if seen_urls is not None and entry.get('link') in seen_urls:
+            skipped += 1
+            continue
+
+        articles.append({
+            'title': entry.get('title', ''),
+            'description': entry.get('description', entry.get('summary', '')),
+            'link': entry.get('link', ''),
+            'picture_links': extract_picture_links(entry, base_url)
+        })
+    return {'articles': articles, 'skipped': skipped, 'not_modified': False, 'cache': new_cache}
@@ -0,0 +1,169 @@
+"""
+Streaming RSS/Atom entry extraction.
+
+Entries come out of an incremental XML parse one at a time and each one's
+element is dropped once read, so a large feed never sits in memory as a full
+tree. Entries are plain dicts with the feedparser keys the fetcher reads
+(title, link, id, description, published_parsed, updated_parsed,
+media_content), which lets feedparser stay in as the fallback for feeds
+this parser can't read.
+"""
+import html
+import io
+import re
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+RSS1_NS = '{http://purl.org/rss/1.0/}'
+RDF_NS = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+MEDIA_CONTENT = '{http://search.yahoo.com/mrss/}content'
+
+FEED_ROOTS = {'rss', ATOM_NS + 'feed', RDF_NS + 'RDF'}
+ENTRY_TAGS = {'item', RSS1_NS + 'item', ATOM_NS + 'entry'}
+
+_IMG_SRC_RE = re.compile(r'''<img\b[^>]*?\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+
+
+class FeedParseError(ValueError):
+    """The content is not a well-formed feed this parser understands."""
+
+
+def first_image(markup: str) -> Optional[str]:
+    """src of the first <img> in an HTML fragment, found without building a tree."""
+    match = _IMG_SRC_RE.search(markup or '')
+    if match is None:
+        return None
+    return html.unescape(next(group for group in match.groups() if group is not None))
+
+
+def iter_entries(content: bytes, base_url: str = '') -> Iterator[Dict[str, Any]]:
+    """
+    Yield the entries of an RSS 2.0, RSS 1.0 or Atom document in order.
+
+    Args:
+        content: Raw feed bytes; the XML declaration decides the encoding
+        base_url: URL the feed was fetched from, for relative entry links
+
+    Raises:
+        FeedParseError: On malformed XML or an unknown document type, possibly
+            after some entries were already yielded
+    """
+    parents: List[ET.Element] = []
+    try:
+        for event, element in ET.iterparse(io.BytesIO(content), events=('start', 'end')):
+            if event == 'start':
+                if not parents and element.tag not in FEED_ROOTS:
+                    raise FeedParseError(f'Not a feed: <{element.tag}>')
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if element.tag not in ENTRY_TAGS:
+                continue
+            if element.tag == ATOM_NS + 'entry':
+                yield _atom_entry(element, base_url)
+            else:
+                yield _rss_entry(element, base_url)
+            # Done with the entry: drop it from the partial tree
+            if parents:
+                parents[-1].remove(element)
+    except ET.ParseError as e:
+        raise FeedParseError(str(e)) from e
+
+
+def _text(element: Optional[ET.Element]) -> str:
+    return (element.text or '').strip() if element is not None else ''
+
+
+def _media_content(element: ET.Element, base_url: str) -> List[Dict[str, str]]:
+    return [{'url': urljoin(base_url, media.get('url', ''))} for media in element.iter(MEDIA_CONTENT)]
+
+
+def _struct_time(value: Optional[datetime]) -> Optional[time.struct_time]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return time.gmtime(value.timestamp())
+
+
+def _rfc822_date(value: str) -> Optional[time.struct_time]:
+    try:
+        return _struct_time(parsedate_to_datetime(value)) if value else None
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _iso_date(value: str) -> Optional[time.struct_time]:
+    try:
+        return _struct_time(datetime.fromisoformat(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _rss_entry(item: ET.Element, base_url: str) -> Dict[str, Any]:
+    ns = RSS1_NS if item.tag.startswith(RSS1_NS) else ''
+    guid_element = item.find('guid')
+    guid = _text(guid_element)
+    link = _text(item.find(ns + 'link'))
+    if guid and guid_element.get('isPermaLink', 'true') != 'false':
+        # A permalink guid is a URL like any link, and stands in for a missing one
+        guid = urljoin(base_url, guid)
+        link = link or guid
+
+    entry: Dict[str, Any] = {
+        'title': _text(item.find(ns + 'title')),
+        'link': urljoin(base_url, link) if link else '',
+        'description': _text(item.find(ns + 'description')) or _text(item.find(CONTENT_ENCODED)),
+    }
+    if guid or item.get(RDF_NS + 'about'):
+        entry['id'] = guid or item.get(RDF_NS + 'about')
+    published = _rfc822_date(_text(item.find('pubDate'))) or _iso_date(_text(item.find(DC_DATE)))
+    if published:
+        entry['published_parsed'] = published
+    media = _media_content(item, base_url)
+    if media:
+        entry['media_content'] = media
+    return entry
+
+
+def _atom_text(element: Optional[ET.Element]) -> str:
+    """Content of an Atom text construct as HTML; xhtml ones are left to feedparser."""
+    if element is None:
+        return ''
+    if element.get('type') == 'xhtml':
+        raise FeedParseError('xhtml content is not supported')
+    return _text(element)
+
+
+def _atom_entry(entry_element: ET.Element, base_url: str) -> Dict[str, Any]:
+    link = ''
+    for link_element in entry_element.findall(ATOM_NS + 'link'):
+        if link_element.get('rel', 'alternate') == 'alternate' and link_element.get('href'):
+            link = link_element.get('href')
+            break
+
+    entry: Dict[str, Any] = {
+        'title': _atom_text(entry_element.find(ATOM_NS + 'title')),
+        'link': urljoin(base_url, link) if link else '',
+        'description': (_atom_text(entry_element.find(ATOM_NS + 'summary'))
+                        or _atom_text(entry_element.find(ATOM_NS + 'content'))),
+    }
+    entry_id = _text(entry_element.find(ATOM_NS + 'id'))
+    if entry_id:
+        entry['id'] = entry_id
+    for key, tag in (('published_parsed', 'published'), ('updated_parsed', 'updated')):
+        parsed = _iso_date(_text(entry_element.find(ATOM_NS + tag)))
+        if parsed:
+            entry[key] = parsed
+    media = _media_content(entry_element, base_url)
+    if media:
+        entry['media_content'] = media
+    return entry
@@ -0,0 +1,118 @@
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from config import INGEST_MAX_WORKERS, INGEST_PER_HOST_LIMIT
+from handlers.feed_fetcher import FeedCache, find_feed_urls, is_feed_url, scrape_single_url
+from utils.metrics import stage
+from utils.seen_urls import SeenUrls
+
+
+def source_host(url: str) -> str:
+    parts = url.split('/')
+    return parts[2] if len(parts) > 2 else url
+
+
+@dataclass
+class SourceResult:
+    url: str
+    source: str
+    rss_url: Optional[str] = None
+    discovered: bool = False  # rss_url comes from a fresh discovery, not the stored one
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    skipped: int = 0  # Entries dropped as already stored
+    discovery_error: Optional[str] = None
+    error: Optional[str] = None
+    not_modified: bool = False
+    feed_cache: Optional[FeedCache] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # Seconds per stage: discovery, fetch, parse, save
+
+
+class IngestionEngine:
+    """
+    Fetches and parses many sources in parallel.
+
+    A bounded thread pool caps the total number of sources in flight and a
+    per-host counter keeps a single site from taking every slot. Results are
+    yielded as each source finishes, so the caller's thread stays in charge of
+    the UI and of database writes.
+
+    feed_caches maps a source URL to what is stored about its feed: recently
+    discovered feeds skip discovery, and unchanged feeds are answered with a
+    304 and never parsed. Entries older than a feed's high-water mark or
+    already in seen_urls are dropped on the worker, before any DB work.
+    """
+
+    def __init__(self, max_workers: int = INGEST_MAX_WORKERS,
+                 per_host_limit: int = INGEST_PER_HOST_LIMIT,
+                 feed_caches: Optional[Dict[str, FeedCache]] = None,
+                 seen_urls: Optional[SeenUrls] = None) -> None:
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.feed_caches = feed_caches or {}
+        self.seen_urls = seen_urls
+
+    def run(self, urls: Iterable[str]) -> Iterator[SourceResult]:
+        pending: Deque[str] = deque(urls)
+        running: Dict[Future, str] = {}
+        host_counts: Counter = Counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='ingest') as pool:
+            while pending or running:
+                pending = self._submit_ready(pool, pending, running, host_counts)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host_counts[running.pop(future)] -= 1
+                    yield future.result()
+
+    def _submit_ready(self, pool: ThreadPoolExecutor, pending: Deque[str],
+                      running: Dict[Future, str], host_counts: Counter) -> Deque[str]:
+        """Submit queued URLs while there are free global and per-host slots."""
+        deferred: Deque[str] = deque()
+        while pending and len(running) < self.max_workers:
+            url = pending.popleft()
+            host = source_host(url)
+            if host_counts[host] >= self.per_host_limit:
+                deferred.append(url)
+                continue
+            host_counts[host] += 1
+            running[pool.submit(self.process_source, url)] = host
+        deferred.extend(pending)
+        return deferred
+
+    def process_source(self, url: str) -> SourceResult:
+        result = SourceResult(url=url, source=source_host(url))
+
+        cache = self.feed_caches.get(url)
+        if is_feed_url(url):
+            result.rss_url = url
+        elif cache and cache.discovery_fresh:
+            result.rss_url = cache.rss_link
+        else:
+            result.discovered = True
+            try:
+                with stage(result.timings, 'discovery'):
+                    result.rss_url = find_feed_urls(url)
+            except Exception as e:
+                # Keep fetching the stored feed with its validators until discovery works again
+                result.discovery_error = str(e)
+                result.rss_url = cache.rss_link if cache else None
+
+        if cache and cache.rss_link != result.rss_url:
+            cache = None
+
+        try:
+            records = scrape_single_url(result.rss_url or url, result.source,
+                                        is_feed=bool(result.rss_url), cache=cache,
+                                        seen_urls=self.seen_urls)
+            result.articles = records.get('articles') or []
+            result.skipped = records.get('skipped', 0)
+            result.not_modified = records.get('not_modified', False)
+            result.feed_cache = records.get('cache')
+            result.timings.update(records.get('timings') or {})
+        except Exception as e:
+            result.error = str(e)
+
+        return result
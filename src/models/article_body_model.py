@@ -0,0 +1,66 @@
+import zlib
+from typing import Optional
+
+from database.db_connection import DatabaseConnection
+from utils.web_scraper import WebScraper
+from config import ARTICLE_BODY_MAX_CHARS, DB_PATH
+
+
+class ArticleBodies:
+    """
+    Main text of articles, fetched once and kept zlib-compressed.
+
+    A body is fetched the first time it is needed and then reused by every
+    chat turn and session. Pages that could not be fetched are not stored,
+    so they are tried again next time.
+    """
+
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.db = DatabaseConnection(db_path)
+        self.create_table()
+
+    def create_table(self) -> None:
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS article_bodies (
+                article_id INTEGER PRIMARY KEY,
+                body BLOB NOT NULL,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (article_id) REFERENCES articles(id)
+            )
+        """)
+
+    def get_body(self, article_id: int) -> Optional[str]:
+        """Stored body text, or None if it was never fetched."""
+        row = self.db.fetch_one('SELECT body FROM article_bodies WHERE article_id = ?', (article_id,))
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def save_body(self, article_id: int, text: str) -> None:
+        self.db.execute(
+            'INSERT OR REPLACE INTO article_bodies (article_id, body) VALUES (?, ?)',
+            (article_id, zlib.compress(text.encode('utf-8')))
+        )
+
+    def fetch_body(self, article_id: int, url: Optional[str]) -> Optional[str]:
+        """
+        Body text of an article, fetching and storing it on first use.
+
+        Args:
+            article_id: Article the body belongs to
+            url: Article URL to fetch when nothing is stored yet
+
+        Returns:
+            The text (empty when the page has none), or None if it could not be fetched
+        """
+        body = self.get_body(article_id)
+        if body is not None or not url:
+            return body
+
+        scraper = WebScraper(url)
+        if scraper.fetch_content(clean=True, minify=True) is None:
+            return None
+        body = scraper.get_main_text(ARTICLE_BODY_MAX_CHARS) or ''
+        self.save_body(article_id, body)
+        return body
+
+    def close_conn(self) -> None:
+        self.db.close()
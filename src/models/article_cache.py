@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+from config import ARTICLE_CACHE_SIZE, ARTICLE_CACHE_TTL
+
+MISS = object()
+
+
+class ArticleQueryCache:
+    """
+    Process-wide LRU cache for article pages and counts.
+
+    Entries are shared by every Streamlit session. Pages are keyset pages, so
+    each one covers a fixed id range [lo, hi): a write to one article only
+    drops the pages whose range contains it, and new articles (which always
+    get the highest id) only affect the first page and the counts.
+    """
+
+    def __init__(self, max_entries: int = ARTICLE_CACHE_SIZE, ttl: float = ARTICLE_CACHE_TTL) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, id_range: Optional[Tuple[int, Optional[int]]] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            id_range: (lo, hi) ids covered by a page, hi None for the first page
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value, id_range)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_article(self, db_name: str, article_id: int, count_filters: Iterable[Optional[str]]) -> None:
+        """Drop every page containing an updated article and the counts of the given filters."""
+        count_keys = {(db_name, 'count', filter_value, collapsed)
+                      for filter_value in count_filters for collapsed in (False, True)}
+        with self._lock:
+            for key in list(self._entries):
+                if key in count_keys:
+                    del self._entries[key]
+                elif key[0] == db_name and key[1] == 'page':
+                    lo, hi = self._entries[key][2]
+                    if lo <= article_id and (hi is None or article_id < hi):
+                        del self._entries[key]
+
+    def invalidate_new_articles(self, db_name: str) -> None:
+        """Drop the entries that newly inserted (unread, non-favorite) articles change."""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != db_name or key[2] is not None:
+                    continue
+                if key[1] == 'count' or self._entries[key][2][1] is None:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+query_cache = ArticleQueryCache()
@@ -1,10 +1,77 @@
-from typing import List, Dict, Any
+import html
+import json
+import re
+import threading
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from database.db_connection import DatabaseConnection
-from config import DB_PATH
+from models.article_cache import MISS, query_cache
+from utils import simhash
+from utils.seen_urls import SeenUrls
+from config import (DB_PATH, DUPLICATE_BATCH_SIZE, DUPLICATE_MAX_DISTANCE,
+                    RECOMMENDER_CANDIDATES, RECOMMENDER_CONTEXT_SIZE,
+                    RECOMMENDER_PER_SOURCE, SEARCH_CANDIDATES)
+
+ARTICLE_COLUMNS = ('id', 'title', 'description', 'url', 'primary_image',
+                   'scraped_date', 'source', 'is_read', 'is_favorite')
+_SELECT_COLUMNS = ', '.join(ARTICLE_COLUMNS)
+_SELECT_ARTICLE_COLUMNS = ', '.join(f'articles.{column}' for column in ARTICLE_COLUMNS)
+_COLUMN_INDEX = {column: i for i, column in enumerate(ARTICLE_COLUMNS)}
+
+
+class ArticleRecord(namedtuple('ArticleRecord', ARTICLE_COLUMNS)):
+    """
+    Read-only article row used by the list views.
+
+    Tuple-backed with no per-row dict. String keys work like they did on the
+    old dict rows; 'image_urls' is still accepted and gives the primary image
+    as a list (all images are in article_images).
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == 'image_urls':
+                return [self.primary_image] if self.primary_image else []
+            return tuple.__getitem__(self, _COLUMN_INDEX[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in _COLUMN_INDEX or key == 'image_urls' else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {column: self[column] for column in ARTICLE_COLUMNS}
+
+
+def _article_row_factory(cursor, row: Tuple) -> ArticleRecord:
+    return tuple.__new__(ArticleRecord, row)
+
+
+def _search_row_factory(cursor, row: Tuple) -> Tuple[ArticleRecord, str]:
+    return tuple.__new__(ArticleRecord, row[:-1]), row[-1]
+
+
+# Legacy image_urls were joined with ',': only split where the next URL starts
+_LEGACY_IMAGE_SPLIT_RE = re.compile(r',\s*(?=(?:https?:)?//)')
+_TAG_RE = re.compile(r'<[^>]*>')
+_SPACE_RE = re.compile(r'\s+')
+_SEARCH_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def strip_html(value: Optional[str]) -> str:
+    """Plain text of an HTML fragment, good enough for indexing."""
+    if not value:
+        return ''
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', value))).strip()
+
+
+_seen_urls: Dict[str, SeenUrls] = {}
+_seen_urls_lock = threading.Lock()
+
 
 class Articles:
-    def __init__(self) -> None:
-        self.db = DatabaseConnection(DB_PATH)
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.db = DatabaseConnection(db_path)
         self.create_table()
 
     def create_table(self) -> None:
@@ -15,20 +82,279 @@ class Articles:
                 description TEXT NULL,
                 url TEXT NULL UNIQUE,
                 image_urls TEXT NULL,
+                primary_image TEXT NULL,
                 scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 source TEXT NULL,
                 is_read INTEGER DEFAULT 0,
                 is_favorite INTEGER DEFAULT 0
             )
         """)
+        # One index per filter tab so keyset pages seek straight to their cursor
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_articles_is_read ON articles (is_read, id)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_articles_is_favorite ON articles (is_favorite, id)')
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS article_images (
+                article_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (article_id, position),
+                FOREIGN KEY (article_id) REFERENCES articles(id)
+            ) WITHOUT ROWID
+        """)
+        # SimHash bands of every fingerprinted article, for near-duplicate lookups
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS article_simhash_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (band, value, article_id),
+                FOREIGN KEY (article_id) REFERENCES articles(id)
+            ) WITHOUT ROWID
+        """)
+        # image_urls is legacy: kept for older databases but no longer written
+        added = self.db.ensure_columns('articles', {
+            'primary_image': 'TEXT NULL',
+            'simhash': 'INTEGER NULL',
+            'duplicate_of': 'INTEGER NULL',
+        })
+        if 'primary_image' in added:
+            self.migrate_image_urls()
+        self.create_search_index()
+        # Lets link_duplicates find articles a crash left without a fingerprint
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_articles_unfingerprinted ON articles (id) WHERE simhash IS NULL')
+        if self.link_duplicates() or 'simhash' in added:
+            query_cache.clear()
+        # Lets the collapsed "All" tab count and seek without touching duplicates
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_articles_canonical ON articles (id) WHERE duplicate_of IS NULL')
 
-    def save_article(self, title: str, description: str, url: str,
-                    image_urls: str, source: str) -> None:
+    def migrate_image_urls(self) -> int:
+        """
+        Move legacy comma-joined image_urls into article_images and primary_image.
+
+        Safe to run more than once.
+
+        Returns:
+            Number of articles migrated
+        """
+        rows = self.db.fetch_all("""
+            SELECT id, image_urls FROM articles
+            WHERE image_urls IS NOT NULL AND image_urls != '' AND primary_image IS NULL
+        """)
+        images = []
+        primary_images = []
+        for article_id, image_urls in rows:
+            urls = [url.strip() for url in _LEGACY_IMAGE_SPLIT_RE.split(image_urls) if url.strip()]
+            images.extend((article_id, position, url) for position, url in enumerate(urls))
+            if urls:
+                primary_images.append((urls[0], article_id))
+
+        with self.db.transaction() as con:
+            con.executemany(
+                'INSERT OR IGNORE INTO article_images (article_id, position, url) VALUES (?, ?, ?)',
+                images
+            )
+            con.executemany('UPDATE articles SET primary_image = ? WHERE id = ?', primary_images)
+        query_cache.clear()
+        return len(primary_images)
+
+    def create_search_index(self) -> None:
+        """
+        Create the FTS5 index over title, description text and source.
+
+        Rows are written by save_articles, which strips the HTML in Python;
+        the only trigger is a deletion one in plain SQL, so writers outside
+        the app (the sqlite3 shell, scripts) can still change the table.
+        """
+        exists = self.db.fetch_one("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+        if exists:
+            # Older databases synced inserts and updates with triggers calling
+            # strip_html, which no other connection has
+            for trigger in ('articles_fts_insert', 'articles_fts_update'):
+                self.db.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            return
+
+        self.db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, body, source,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """)
+        # Title matches outrank body matches; source names sit in between
+        self.db.execute("INSERT INTO articles_fts (articles_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 2.0)')")
         self.db.execute("""
-            INSERT OR IGNORE INTO articles
-            (title, description, url, image_urls, source)
-            VALUES (?, ?, ?, ?, ?)
-        """, (title, description, url, image_urls, source))
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                DELETE FROM articles_fts WHERE rowid = old.id;
+            END
+        """)
+        with self.db.transaction() as con:
+            self.index_articles(con)
+
+    @staticmethod
+    def index_articles(con, after_id: int = 0) -> int:
+        """Add articles with ids above after_id to the search index; returns how many."""
+        cursor = con.execute(
+            'SELECT id, title, description, source FROM articles WHERE id > ? ORDER BY id', (after_id,)
+        )
+        indexed = 0
+        while True:
+            rows = cursor.fetchmany(DUPLICATE_BATCH_SIZE)
+            if not rows:
+                return indexed
+            con.executemany(
+                'INSERT INTO articles_fts (rowid, title, body, source) VALUES (?, ?, ?, ?)',
+                [(article_id, title, strip_html(description), source)
+                 for article_id, title, description, source in rows]
+            )
+            indexed += len(rows)
+
+    def save_article(self, title: str, description: str, url: str,
+                    image_urls: Optional[List[str]], source: str) -> None:
+        self.save_articles([{
+            'title': title,
+            'description': description,
+            'link': url,
+            'picture_links': image_urls
+        }], source)
+
+    def save_articles(self, entries: Iterable[Dict[str, Any]], source: str) -> Tuple[int, int]:
+        """
+        Normalize scraped entries and insert them, with their images, in one transaction.
+
+        Args:
+            entries: Scraped article dicts with title, description, link and picture_links
+            source: Source the articles were scraped from
+
+        Returns:
+            Tuple of (inserted, ignored as duplicates)
+        """
+        rows = []
+        images = []
+        titles = set()
+        repeated = 0
+        for entry in entries:
+            row, urls = self._normalize_entry(entry, source)
+            # Images are matched back to their article by title, so a second
+            # entry with the same title would lend its images to the first
+            if row[0] in titles:
+                repeated += 1
+                continue
+            titles.add(row[0])
+            rows.append(row)
+            images.extend((position, url, row[0]) for position, url in enumerate(urls))
+        if not rows:
+            return 0, repeated
+
+        # Taking the write lock first keeps other writers' rows out of the
+        # id range the images and the search index are matched by
+        with self.db.transaction(immediate=True) as con:
+            last_id = con.execute('SELECT COALESCE(MAX(id), 0) FROM articles').fetchone()[0]
+            inserted = con.executemany("""
+                INSERT OR IGNORE INTO articles
+                (title, description, url, primary_image, source)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows).rowcount
+            # Only rows created by this call get images; duplicates keep their own
+            con.executemany("""
+                INSERT OR IGNORE INTO article_images (article_id, position, url)
+                SELECT id, ?, ? FROM articles WHERE title = ? AND id > ?
+            """, [image + (last_id,) for image in images])
+            if inserted:
+                self.index_articles(con, last_id)
+
+        if inserted:
+            self.link_duplicates()
+            query_cache.invalidate_new_articles(self.db.db_name)
+        self._remember_urls(row[2] for row in rows)
+        return inserted, len(rows) - inserted + repeated
+
+    def link_duplicates(self) -> int:
+        """
+        Fingerprint the articles that have no fingerprint yet and link
+        near-duplicates to their canonical article.
+
+        Each article gets a SimHash of its title and description text. An
+        earlier article whose fingerprint differs in at most
+        DUPLICATE_MAX_DISTANCE bits shares at least one of the 16-bit bands
+        (as long as that is below simhash.BANDS), so candidates are found
+        with one index seek per band. The duplicate points at the earliest
+        match's canonical article. Articles without any text are stored with
+        a fingerprint of 0 and never match.
+
+        Fingerprinting commits separately from the insert, so articles left
+        behind by a failure in between are picked up by the next call.
+
+        Returns:
+            Number of articles linked as duplicates
+        """
+        linked = 0
+        after_id = 0
+        while True:
+            rows = self.db.fetch_all("""
+                SELECT id, title, description FROM articles
+                WHERE simhash IS NULL AND id > ? ORDER BY id LIMIT ?
+            """, (after_id, DUPLICATE_BATCH_SIZE))
+            if not rows:
+                return linked
+            fingerprints = simhash.simhash_batch(
+                [f'{title} {strip_html(description)}' for _, title, description in rows]
+            )
+            with self.db.transaction() as con:
+                for (article_id, _, _), fingerprint in zip(rows, fingerprints.tolist()):
+                    if fingerprint:
+                        linked += self._link_duplicate(con, article_id, fingerprint)
+                    else:
+                        con.execute('UPDATE articles SET simhash = 0 WHERE id = ?', (article_id,))
+            after_id = rows[-1][0]
+
+    @staticmethod
+    def _link_duplicate(con, article_id: int, fingerprint: int) -> int:
+        bands = list(enumerate(simhash.bands(fingerprint)))
+        candidates = con.execute(f"""
+            SELECT articles.id, articles.simhash, articles.duplicate_of
+            FROM article_simhash_bands
+            JOIN articles ON articles.id = article_simhash_bands.article_id
+            WHERE {' OR '.join(['(band = ? AND value = ?)'] * len(bands))}
+        """, [part for band in bands for part in band]).fetchall()
+
+        canonical = None
+        for candidate_id, candidate_hash, duplicate_of in sorted(candidates):
+            if candidate_id < article_id and \
+                    simhash.distance(simhash.to_unsigned(candidate_hash), fingerprint) <= DUPLICATE_MAX_DISTANCE:
+                canonical = duplicate_of or candidate_id
+                break
+
+        con.execute('UPDATE articles SET simhash = ?, duplicate_of = ? WHERE id = ?',
+                    (simhash.to_signed([fingerprint])[0], canonical, article_id))
+        con.executemany(
+            'INSERT OR IGNORE INTO article_simhash_bands (band, value, article_id) VALUES (?, ?, ?)',
+            [(band, value, article_id) for band, value in bands]
+        )
+        return canonical is not None
+
+    @staticmethod
+    def _normalize_entry(entry: Dict[str, Any], source: str) -> Tuple[Tuple[Any, ...], List[str]]:
+        image_urls = [url for url in entry.get('picture_links') or [] if url]
+        # Get only the first line of the title if it contains multiple lines
+        title = entry['title'].split('\n')[0].strip() if entry.get('title') else ''
+        # Use title as description if description is None or empty
+        description = entry.get('description') or entry.get('title')
+        primary_image = image_urls[0] if image_urls else None
+        return (title, description, entry.get('link'), primary_image, source), image_urls
+
+    def get_seen_urls(self) -> SeenUrls:
+        """Process-wide set of stored article URLs, loaded from the table on first use."""
+        with _seen_urls_lock:
+            seen_urls = _seen_urls.get(self.db.db_name)
+            if seen_urls is None:
+                rows = self.db.iterate('SELECT url FROM articles WHERE url IS NOT NULL')
+                seen_urls = _seen_urls[self.db.db_name] = SeenUrls(row[0] for row in rows)
+            return seen_urls
+
+    def _remember_urls(self, urls: Iterable[Optional[str]]) -> None:
+        seen_urls = _seen_urls.get(self.db.db_name)
+        if seen_urls is not None:
+            seen_urls.add_many(urls)
 
     def toggle_read_status(self, article_id: int) -> None:
         self.db.execute("""
@@ -36,6 +362,7 @@ class Articles:
             SET is_read = CASE WHEN is_read = 0 THEN 1 ELSE 0 END
             WHERE id = ?
         """, (article_id,))
+        query_cache.invalidate_article(self.db.db_name, article_id, ['read'])
 
     def read(self, article_id: int) -> None:
         self.db.execute("""
@@ -43,6 +370,7 @@ class Articles:
             SET is_read = 1
             WHERE id = ?
         """, (article_id,))
+        query_cache.invalidate_article(self.db.db_name, article_id, ['read'])
 
     def toggle_favorite_status(self, article_id: int) -> None:
         self.db.execute("""
@@ -50,6 +378,7 @@ class Articles:
             SET is_favorite = CASE WHEN is_favorite = 0 THEN 1 ELSE 0 END
             WHERE id = ?
         """, (article_id,))
+        query_cache.invalidate_article(self.db.db_name, article_id, ['favorites'])
 
     def set_favorite(self, article_id: int) -> None:
         self.db.execute("""
@@ -57,99 +386,227 @@ class Articles:
             SET is_favorite = 1
             WHERE id = ?
         """, (article_id,))
+        query_cache.invalidate_article(self.db.db_name, article_id, ['favorites'])
 
-    @staticmethod
-    def _convert_image_urls_to_array(image_urls_str: str) -> List[str]:
-        return image_urls_str.split(',') if image_urls_str else []
+    def get_article_images(self, article_id: int) -> List[str]:
+        rows = self.db.fetch_all(
+            'SELECT url FROM article_images WHERE article_id = ? ORDER BY position', (article_id,)
+        )
+        return [row[0] for row in rows]
 
     def get_articles_as_dicts(self) -> List[Dict[str, Any]]:
-        columns = [column[1] for column in
-                  self.db.fetch_all('PRAGMA table_info(articles)')]
-
-        records = self.db.fetch_all('SELECT * FROM articles ORDER BY id DESC')
-
+        rows = self.db.fetch_all(f"""
+            SELECT {_SELECT_COLUMNS},
+                   (SELECT json_group_array(url) FROM (
+                        SELECT url FROM article_images
+                        WHERE article_id = articles.id ORDER BY position))
+            FROM articles ORDER BY id DESC
+        """)
         articles = []
-        for record in records:
-            article = {}
-            for i, column in enumerate(columns):
-                value = record[i]
-                if column == 'image_urls' and value:
-                    value = self._convert_image_urls_to_array(value)
-                article[column] = value
+        for row in rows:
+            article = dict(zip(ARTICLE_COLUMNS, row))
+            article['image_urls'] = json.loads(row[-1])
             articles.append(article)
-
         return articles
 
     def get_total_articles(self) -> int:
         result = self.db.fetch_one('SELECT COUNT(*) FROM articles')
         return result[0] if result else 0
 
-    def get_paginated_articles(self, page: int, per_page: int = 10) -> List[Dict[str, Any]]:
-        offset = (page - 1) * per_page
-        columns = [column[1] for column in
-                  self.db.fetch_all('PRAGMA table_info(articles)')]
+    def get_paginated_articles(self, page: int, per_page: int = 10) -> List[ArticleRecord]:
+        return self.get_filtered_articles(page, per_page)
 
-        records = self.db.fetch_all(
-            'SELECT * FROM articles ORDER BY id DESC LIMIT ? OFFSET ?',
-            (per_page, offset)
-        )
+    @staticmethod
+    def _filter_condition(filter_value: Optional[str]) -> Optional[str]:
+        if filter_value == "favorites":
+            return 'is_favorite = 1'
+        if filter_value == "read":
+            return 'is_read = 1'
+        return None
 
-        articles = []
-        for record in records:
-            article = {}
-            for i, column in enumerate(columns):
-                value = record[i]
-                if column == 'image_urls' and value:
-                    value = self._convert_image_urls_to_array(value)
-                article[column] = value
-            articles.append(article)
+    def _where(self, filter_value: Optional[str], *conditions: str, collapse_duplicates: bool = False) -> str:
+        if collapse_duplicates:
+            conditions += ('duplicate_of IS NULL',)
+        conditions = [c for c in (self._filter_condition(filter_value),) + conditions if c]
+        return f' WHERE {" AND ".join(conditions)}' if conditions else ''
 
-        return articles
+    def get_total_filtered_articles(self, filter_value: str = None, collapse_duplicates: bool = False) -> int:
+        key = (self.db.db_name, 'count', filter_value, collapse_duplicates)
+        total = query_cache.get(key)
+        if total is MISS:
+            where = self._where(filter_value, collapse_duplicates=collapse_duplicates)
+            result = self.db.fetch_one(f'SELECT COUNT(*) FROM articles{where}')
+            total = result[0] if result else 0
+            query_cache.put(key, total)
+        return total
 
-    def get_total_filtered_articles(self, filter_value: str = None) -> int:
-        query = 'SELECT COUNT(*) FROM articles'
-        params = ()
+    def get_page_cursor(self, page: int, per_page: int = 10, filter_value: str = None,
+                        collapse_duplicates: bool = False) -> Optional[int]:
+        """
+        Find the cursor that starts a numbered page.
 
-        if filter_value is not None:
-            if filter_value == "favorites":
-                query += ' WHERE is_favorite = 1'
-            elif filter_value == "read":
-                query += ' WHERE is_read = ?'
-                params = (1 if filter_value else 0,)
+        Moving to the next page never gets here, since the caller keeps the
+        previous page's last id. A jump to any other page steps over the
+        articles before it, which costs O(offset); pages past the middle are
+        counted from the oldest end instead, so the cost is at most half the
+        tab and the last page is as cheap as the first.
 
-        result = self.db.fetch_one(query, params)
+        Args:
+            page: Page number, starting at 1
+            per_page: Articles per page
+            filter_value: Tab filter ("read", "favorites" or None for all)
+            collapse_duplicates: Leave out articles linked to a canonical one
+
+        Returns:
+            Id of the last article on the previous page, None for the first
+            page, or 0 when the page is past the end
+        """
+        if page <= 1:
+            return None
+        offset = (page - 1) * per_page - 1
+        total = self.get_total_filtered_articles(filter_value, collapse_duplicates)
+        if offset >= total:
+            return 0
+
+        where = self._where(filter_value, collapse_duplicates=collapse_duplicates)
+        if offset <= total // 2:
+            query, skip = f'SELECT id FROM articles{where} ORDER BY id DESC LIMIT 1 OFFSET ?', offset
+        else:
+            query, skip = f'SELECT id FROM articles{where} ORDER BY id ASC LIMIT 1 OFFSET ?', total - 1 - offset
+        result = self.db.fetch_one(query, (skip,))
         return result[0] if result else 0
 
-    def get_filtered_articles(self, page: int, per_page: int = 10, filter_value: str = None) -> List[Dict[str, Any]]:
-        offset = (page - 1) * per_page
-        columns = [column[1] for column in self.db.fetch_all('PRAGMA table_info(articles)')]
+    def get_articles_after(self, cursor: Optional[int], per_page: int = 10,
+                           filter_value: str = None, collapse_duplicates: bool = False) -> List[ArticleRecord]:
+        """
+        Fetch a page of articles using keyset pagination.
+
+        Args:
+            cursor: Id of the last article already shown, None for the first page
+            per_page: Articles per page
+            filter_value: Tab filter ("read", "favorites" or None for all)
+            collapse_duplicates: Leave out articles linked to a canonical one
+
+        Returns:
+            Up to per_page articles with ids below cursor, newest first
+        """
+        key = (self.db.db_name, 'page', filter_value, cursor, per_page, collapse_duplicates)
+        articles = query_cache.get(key)
+        if articles is not MISS:
+            return list(articles)
 
-        query = 'SELECT * FROM articles'
         params = []
+        where = self._where(filter_value, collapse_duplicates=collapse_duplicates)
+        if cursor is not None:
+            where = self._where(filter_value, 'id < ?', collapse_duplicates=collapse_duplicates)
+            params.append(cursor)
+        params.append(per_page)
 
-        if filter_value is not None:
-            if filter_value == "favorites":
-                query += ' WHERE is_favorite = 1'
-            elif filter_value == "read":
-                query += ' WHERE is_read = ?'
-                params.append(1 if filter_value else 0)
+        articles = self.db.fetch_all(
+            f'SELECT {_SELECT_COLUMNS} FROM articles{where} ORDER BY id DESC LIMIT ?',
+            tuple(params),
+            row_factory=_article_row_factory
+        )
+        # A short page runs to the end of the table, so it covers every lower id
+        lo = articles[-1].id if len(articles) == per_page else 0
+        query_cache.put(key, tuple(articles), id_range=(lo, cursor))
+        return articles
 
-        query += ' ORDER BY id DESC LIMIT ? OFFSET ?'
-        params.extend([per_page, offset])
+    def get_filtered_articles(self, page: int, per_page: int = 10, filter_value: str = None,
+                              cursor: Optional[int] = None,
+                              collapse_duplicates: bool = False) -> List[ArticleRecord]:
+        if cursor is None:
+            cursor = self.get_page_cursor(page, per_page, filter_value, collapse_duplicates)
+        return self.get_articles_after(cursor, per_page, filter_value, collapse_duplicates)
 
-        records = self.db.fetch_all(query, tuple(params))
+    @staticmethod
+    def _search_match(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+        terms = _SEARCH_TERM_RE.findall(query)
+        if not terms:
+            return None
+        match = ' '.join(f'"{term}"' for term in terms)
+        return match if query[-1:].isspace() else match + '*'
 
-        articles = []
-        for record in records:
-            article = {}
-            for i, column in enumerate(columns):
-                value = record[i]
-                if column == 'image_urls' and value:
-                    value = self._convert_image_urls_to_array(value)
-                article[column] = value
-            articles.append(article)
+    def search_articles(self, query: str, limit: int = 24) -> List[Tuple[ArticleRecord, str]]:
+        """
+        Full-text search over title, description text and source.
 
-        return articles
+        Args:
+            query: Free text; the last word also matches as a prefix
+            limit: Maximum number of results
+
+        Returns:
+            (article, snippet) pairs, best match first among the newest
+            SEARCH_CANDIDATES matches; matched words in the snippet are
+            wrapped in ** for markdown
+        """
+        match = self._search_match(query)
+        if match is None:
+            return []
+
+        # Rank only the newest matches so very common words stay as cheap as rare ones
+        ids = [row[0] for row in self.db.fetch_all("""
+            SELECT rowid FROM (
+                SELECT rowid, rank FROM articles_fts
+                WHERE articles_fts MATCH ?
+                ORDER BY rowid DESC
+                LIMIT ?
+            )
+            ORDER BY rank
+            LIMIT ?
+        """, (match, SEARCH_CANDIDATES, limit))]
+        if not ids:
+            return []
+
+        placeholders = ','.join('?' * len(ids))
+        results = self.db.fetch_all(f"""
+            SELECT {_SELECT_ARTICLE_COLUMNS},
+                   snippet(articles_fts, 1, '**', '**', '…', 24)
+            FROM articles_fts
+            JOIN articles ON articles.id = articles_fts.rowid
+            WHERE articles_fts MATCH ? AND articles_fts.rowid IN ({placeholders})
+        """, (match, *ids), row_factory=_search_row_factory)
+        position = {article_id: i for i, article_id in enumerate(ids)}
+        return sorted(results, key=lambda result: position[result[0].id])
+
+    def get_context_articles(self, limit: int = RECOMMENDER_CONTEXT_SIZE,
+                             per_source: int = RECOMMENDER_PER_SOURCE) -> List[ArticleRecord]:
+        """
+        A small, varied sample of what the user reads, for LLM context.
+
+        Candidates are the newest RECOMMENDER_CANDIDATES articles plus the
+        newest favorites, both read off an index. Each source contributes at
+        most per_source of them, favorites first, and sources take turns so
+        one busy feed can't fill the sample.
+
+        Args:
+            limit: Maximum number of articles
+            per_source: Maximum articles from one source
+
+        Returns:
+            Articles ordered by their turn, then favorites and newest first
+        """
+        return self.db.fetch_all(f"""
+            WITH candidates AS (
+                SELECT id FROM (SELECT id FROM articles ORDER BY id DESC LIMIT ?)
+                UNION
+                SELECT id FROM (SELECT id FROM articles WHERE is_favorite = 1 ORDER BY id DESC LIMIT ?)
+            ),
+            ranked AS (
+                SELECT {_SELECT_ARTICLE_COLUMNS},
+                       ROW_NUMBER() OVER (
+                           PARTITION BY articles.source
+                           ORDER BY articles.is_favorite DESC, articles.id DESC
+                       ) AS turn
+                FROM candidates JOIN articles ON articles.id = candidates.id
+            )
+            SELECT {_SELECT_COLUMNS} FROM ranked
+            WHERE turn <= ?
+            ORDER BY turn, is_favorite DESC, id DESC
+            LIMIT ?
+        """, (RECOMMENDER_CANDIDATES, RECOMMENDER_CANDIDATES, per_source, limit),
+            row_factory=_article_row_factory)
 
     def close_conn(self) -> None:
         self.db.close()
\ No newline at end of file
@@ -4,8 +4,8 @@ from database.db_connection import DatabaseConnection
 from config import DB_PATH
 
 class Chat:
-    def __init__(self) -> None:
-        self.db = DatabaseConnection(DB_PATH)
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.db = DatabaseConnection(db_path)
         self.create_table()
 
     def create_table(self) -> None:
@@ -20,6 +20,10 @@ class Chat:
                 FOREIGN KEY (article_id) REFERENCES articles(id)
             )
         """)
+        # Ids grow with every insert, so (article_id, id) serves both the order
+        # and the seek past the loaded history
+        self.db.execute('DROP INDEX IF EXISTS idx_chats_article_id')
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_chats_article ON chats (article_id, id)')
 
     def save_chat(self, article_id: int, user_message: Optional[str] = None, assistant_message: Optional[str] = None, generated_post: Optional[str] = None) -> None:
         self.db.execute("""
@@ -27,11 +31,20 @@ class Chat:
             VALUES (?, ?, ?, ?)
         """, (article_id, user_message, assistant_message, generated_post))
 
-    def get_chats_by_article(self, article_id: int) -> List[Dict[str, Any]]:
+    def get_chats_by_article(self, article_id: int, after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Chats of an article in the order they were saved.
+
+        Args:
+            article_id: Article the chats belong to
+            after_id: Only return chats with a higher id, to top up a loaded history
+        """
         rows = self.db.fetch_all("""
-            SELECT * FROM chats
-            WHERE article_id = ?
-        """, (article_id,))
+            SELECT id, article_id, user_message, assistant_message, generated_post, created_at
+            FROM chats
+            WHERE article_id = ? AND id > ?
+            ORDER BY id
+        """, (article_id, after_id))
         columns = ["id", "article_id", "user_message", "assistant_message", "generated_post", "created_at"]
         return [dict(zip(columns, row)) for row in rows]
 
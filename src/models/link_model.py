@@ -1,11 +1,11 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from database.db_connection import DatabaseConnection
-from config import DB_PATH
+from config import DB_PATH, FEED_DISCOVERY_TTL
 
 class Links:
-    def __init__(self) -> None:
-        self.db = DatabaseConnection(DB_PATH)
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.db = DatabaseConnection(db_path)
         self.create_table()
 
     def create_table(self) -> None:
@@ -14,15 +14,46 @@ class Links:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 link TEXT NOT NULL UNIQUE,
                 rss_link TEXT UNIQUE,
-                last_scrapped_at DATETIME
+                last_scrapped_at DATETIME,
+                refresh_interval INTEGER NULL,
+                rss_checked_at DATETIME NULL,
+                etag TEXT NULL,
+                last_modified TEXT NULL,
+                content_hash TEXT NULL,
+                last_entry_at INTEGER NULL,
+                last_entry_guid TEXT NULL
             )
         """)
+        # Databases created before refresh scheduling, discovery and feed caching were stored
+        self.db.ensure_columns('links', {
+            'refresh_interval': 'INTEGER NULL',
+            'rss_checked_at': 'DATETIME NULL',
+            'etag': 'TEXT NULL',
+            'last_modified': 'TEXT NULL',
+            'content_hash': 'TEXT NULL',
+            'last_entry_at': 'INTEGER NULL',
+            'last_entry_guid': 'TEXT NULL',
+        })
 
     def save_link(self, link: str, rss_link: str = None) -> None:
         self.db.execute(
             "INSERT OR IGNORE INTO links (link, rss_link, last_scrapped_at) VALUES (?, ?, NULL)",
             (link, rss_link)
         )
+        # A different feed invalidates the cached validators of the old one
+        self.db.execute("""
+            UPDATE OR IGNORE links
+            SET rss_link = ?, etag = NULL, last_modified = NULL, content_hash = NULL,
+                last_entry_at = NULL, last_entry_guid = NULL
+            WHERE link = ? AND rss_link IS NOT ?
+        """, (rss_link, link, rss_link))
+
+    def sync_links(self, links: List[str]) -> None:
+        """Keep exactly the given links, preserving what is stored for existing ones."""
+        placeholders = ','.join('?' * len(links))
+        self.db.execute(f'DELETE FROM links WHERE link NOT IN ({placeholders})', tuple(links))
+        for link in links:
+            self.db.execute('INSERT OR IGNORE INTO links (link) VALUES (?)', (link,))
 
     def update_last_scrapped(self, link: str) -> None:
         self.db.execute(
@@ -30,6 +61,53 @@ class Links:
             (datetime.now(), link)
         )
 
+    def get_refresh_schedule(self) -> List[Tuple[str, Optional[str], Optional[int]]]:
+        """(link, last_scrapped_at, refresh_interval in seconds or None for the default)."""
+        return self.db.fetch_all('SELECT link, last_scrapped_at, refresh_interval FROM links')
+
+    def set_refresh_interval(self, link: str, seconds: Optional[int]) -> None:
+        self.db.execute('UPDATE links SET refresh_interval = ? WHERE link = ?', (seconds, link))
+
+    def get_feed_caches(self) -> Dict[str, Dict[str, Any]]:
+        """What is stored about every link's feed, keyed by link."""
+        rows = self.db.fetch_all("""
+            SELECT link, rss_link,
+                   COALESCE(rss_checked_at > datetime('now', ?), 0),
+                   etag, last_modified, content_hash, last_entry_at, last_entry_guid
+            FROM links
+        """, (f'-{FEED_DISCOVERY_TTL} seconds',))
+        columns = ["rss_link", "discovery_fresh", "etag", "last_modified", "content_hash",
+                   "last_entry_at", "last_entry_guid"]
+        return {row[0]: dict(zip(columns, row[1:])) for row in rows}
+
+    def mark_feed_discovered(self, link: str) -> None:
+        """Record that the link's rss_link (or its absence) was just looked up."""
+        self.db.execute(
+            "UPDATE links SET rss_checked_at = CURRENT_TIMESTAMP WHERE link = ?", (link,)
+        )
+
+    def update_feed_cache(self, link: str, etag: Optional[str],
+                          last_modified: Optional[str], content_hash: Optional[str],
+                          last_entry_at: Optional[int] = None,
+                          last_entry_guid: Optional[str] = None) -> None:
+        """
+        Store the validators and high-water mark of a feed's latest fetch.
+
+        Args:
+            link: Source link the feed belongs to
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            content_hash: SHA-256 of the feed body
+            last_entry_at: Newest entry publish time (Unix seconds)
+            last_entry_guid: Guid of the newest entry
+        """
+        self.db.execute("""
+            UPDATE links
+            SET etag = ?, last_modified = ?, content_hash = ?,
+                last_entry_at = ?, last_entry_guid = ?
+            WHERE link = ?
+        """, (etag, last_modified, content_hash, last_entry_at, last_entry_guid, link))
+
     def get_all_links(self) -> List[Tuple[str, str, datetime]]:
         return self.db.fetch_all('SELECT link, rss_link, last_scrapped_at FROM links')
 
@@ -37,4 +115,4 @@ class Links:
         self.db.execute('DELETE FROM "links"')
 
     def close_conn(self) -> None:
-        self.db.close()
\ No newline at end of file
+        self.db.close()
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from database.db_connection import DatabaseConnection
+from config import DB_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL
+
+# Lookups since the process started, shared by every LLMCache instance
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+class LLMCache:
+    """
+    Completions stored by a hash of everything that went into the request.
+
+    Entries expire after ttl seconds, and once there are more than
+    max_entries the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, ttl: int = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES) -> None:
+        self.db = DatabaseConnection(db_path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.create_table()
+
+    def create_table(self) -> None:
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                last_used_at INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        self.db.execute(
+            'CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used_at ON llm_cache(last_used_at)'
+        )
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """SHA-256 of the request parts, independent of their order."""
+        payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for a key, or None if it is missing or expired."""
+        now = int(time.time())
+        row = self.db.fetch_one(
+            'SELECT response FROM llm_cache WHERE key = ? AND created_at > ?',
+            (key, now - self.ttl)
+        )
+        with _stats_lock:
+            _stats['hits' if row else 'misses'] += 1
+        if row is None:
+            return None
+        self.db.execute(
+            'UPDATE llm_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?', (now, key)
+        )
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response, then evict expired and least recently used entries."""
+        now = int(time.time())
+        with self.db.transaction() as con:
+            con.execute("""
+                INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_used_at, hits)
+                VALUES (?, ?, ?, ?, 0)
+            """, (key, response, now, now))
+            con.execute('DELETE FROM llm_cache WHERE created_at <= ?', (now - self.ttl,))
+            con.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def stats(self) -> Dict[str, int]:
+        """Hits and misses in this process, and the number of stored entries."""
+        with _stats_lock:
+            counters = dict(_stats)
+        counters['entries'] = self.db.fetch_one('SELECT COUNT(*) FROM llm_cache')[0]
+        return counters
+
+    def clear(self) -> None:
+        self.db.execute('DELETE FROM llm_cache')
+
+    def close_conn(self) -> None:
+        self.db.close()
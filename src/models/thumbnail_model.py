@@ -0,0 +1,91 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.db_connection import DatabaseConnection
+from config import DB_PATH, THUMBNAIL_RETRY_AFTER
+
+
+class Thumbnails:
+    """
+    Which local thumbnail file stands for each remote image URL.
+
+    Files are named by the hash of the downloaded image, so several URLs
+    serving the same image share one file. A row without a file records a
+    failed download; it is retried after THUMBNAIL_RETRY_AFTER seconds.
+    """
+
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.db = DatabaseConnection(db_path)
+        self.create_table()
+
+    def create_table(self) -> None:
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                url TEXT PRIMARY KEY,
+                file TEXT NULL,
+                updated_at INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        # Eviction drops every URL pointing at a deleted file
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_thumbnails_file ON thumbnails (file)')
+
+    def get_files(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Thumbnail file of each URL that has one."""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+        placeholders = ','.join('?' * len(urls))
+        return dict(self.db.fetch_all(
+            f'SELECT url, file FROM thumbnails WHERE file IS NOT NULL AND url IN ({placeholders})',
+            tuple(urls)
+        ))
+
+    def get_pending(self, urls: Iterable[str]) -> List[str]:
+        """The URLs that have no thumbnail and no recent failed attempt."""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return []
+        placeholders = ','.join('?' * len(urls))
+        done = {row[0] for row in self.db.fetch_all(
+            f'SELECT url FROM thumbnails WHERE url IN ({placeholders}) '
+            'AND (file IS NOT NULL OR updated_at > ?)',
+            tuple(urls) + (int(time.time()) - THUMBNAIL_RETRY_AFTER,)
+        )}
+        return [url for url in urls if url not in done]
+
+    def get_latest_article_id(self) -> int:
+        row = self.db.fetch_one('SELECT COALESCE(MAX(id), 0) FROM articles')
+        return row[0] if row else 0
+
+    def get_missing(self, after_id: int, up_to_id: int, limit: int) -> List[Tuple[int, str]]:
+        """
+        (article id, primary image) of articles in (after_id, up_to_id] still
+        needing a thumbnail, oldest first.
+
+        Only that id range is read, so a pass costs the number of new articles
+        rather than the size of the table.
+        """
+        return self.db.fetch_all("""
+            SELECT a.id, a.primary_image
+            FROM articles a
+            LEFT JOIN thumbnails t ON t.url = a.primary_image
+            WHERE a.id > ? AND a.id <= ?
+              AND a.primary_image IS NOT NULL AND a.primary_image != ''
+              AND (t.url IS NULL OR (t.file IS NULL AND t.updated_at <= ?))
+            ORDER BY a.id
+            LIMIT ?
+        """, (after_id, up_to_id, int(time.time()) - THUMBNAIL_RETRY_AFTER, limit))
+
+    def save(self, url: str, file: Optional[str]) -> None:
+        """Record the thumbnail of url, or None when it could not be made."""
+        self.db.execute(
+            'INSERT OR REPLACE INTO thumbnails (url, file, updated_at) VALUES (?, ?, ?)',
+            (url, file, int(time.time()))
+        )
+
+    def forget_files(self, files: Iterable[str]) -> int:
+        """Drop the URLs of evicted files so they are made again when needed."""
+        return self.db.execute_many('DELETE FROM thumbnails WHERE file = ?', [(file,) for file in files])
+
+    def close_conn(self) -> None:
+        self.db.close()
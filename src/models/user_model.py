@@ -1,32 +1,26 @@
-import sqlite3
+from database.db_connection import DatabaseConnection
 
 class Users:
-    def __init__(self):
-        self.conn = sqlite3.connect('articles.db', check_same_thread=False)
+    def __init__(self, db_path='articles.db'):
+        self.db = DatabaseConnection(db_path)
         self.create_table()
 
     def create_table(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self.db.execute('''
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
                 medium_token TEXT
             )
         ''')
-        self.conn.commit()
 
     def add_user(self, username, medium_token=None):
-        cursor = self.conn.cursor()
-        cursor.execute('INSERT OR REPLACE INTO users (username, medium_token) VALUES (?, ?)',
-                      (username, medium_token))
-        self.conn.commit()
+        self.db.execute('INSERT OR REPLACE INTO users (username, medium_token) VALUES (?, ?)',
+                        (username, medium_token))
 
     def get_user_token(self, username):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT medium_token FROM users WHERE username = ?', (username,))
-        result = cursor.fetchone()
+        result = self.db.fetch_one('SELECT medium_token FROM users WHERE username = ?', (username,))
         return result[0] if result else None
 
     def close_conn(self):
-        self.conn.close()
+        self.db.close()
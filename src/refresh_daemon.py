@@ -0,0 +1,145 @@
+"""
+Headless refresh daemon: keeps articles up to date without the Streamlit UI.
+
+Run from the src directory:
+
+    python -m refresh_daemon            # refresh due sources forever
+    python -m refresh_daemon --once     # one pass over due sources, then exit
+
+After a pass that saves articles it also makes local thumbnails of their
+images, so the UI rarely has to fall back to remote ones.
+"""
+import argparse
+import hashlib
+import logging
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from config import (INGEST_MAX_WORKERS, INGEST_PER_HOST_LIMIT, METRICS_EXPORT_PATH,
+                    REFRESH_INTERVAL, REFRESH_JITTER, REFRESH_TICK, THUMBNAIL_BATCH_SIZE,
+                    THUMBNAIL_PASS_TIMEOUT)
+from handlers.scraping_handler import build_engine, handle_scraping
+from models.article_model import Articles
+from models.link_model import Links
+from utils.metrics import metrics
+from utils.thumbnailer import get_thumbnailer
+
+logger = logging.getLogger('refresh_daemon')
+
+
+def jitter_fraction(link: str) -> float:
+    """A fixed number in [-1, 1] for a link, so its refresh offset is the same on every tick."""
+    digest = hashlib.blake2b(link.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / (2 ** 63) - 1
+
+
+def is_due(link: str, last_scrapped_at: Optional[str], interval: float, jitter: float,
+           now: datetime) -> bool:
+    """Whether a source last refreshed at last_scrapped_at should be refreshed now."""
+    if not last_scrapped_at:
+        return True
+    # Spread sources added together so they don't all come due on the same tick;
+    # the offset is derived from the link, so each source keeps its own due time
+    jittered = interval * (1 + jitter * jitter_fraction(link))
+    return datetime.fromisoformat(str(last_scrapped_at)) + timedelta(seconds=jittered) <= now
+
+
+def due_links(links_model: Links, default_interval: float, jitter: float) -> List[str]:
+    now = datetime.now()
+    return [
+        link for link, last_scrapped_at, interval in links_model.get_refresh_schedule()
+        if is_due(link, last_scrapped_at, interval or default_interval, jitter, now)
+    ]
+
+
+def refresh_once(args: argparse.Namespace) -> int:
+    """Refresh every due source once; returns the number of new articles."""
+    links_model = Links()
+    articles_model = Articles()
+    try:
+        urls = due_links(links_model, args.interval, args.jitter)
+        if not urls:
+            logger.debug("No sources due")
+            return 0
+
+        logger.info("Refreshing %d due sources", len(urls))
+        engine = build_engine(links_model, articles_model,
+                              max_workers=args.workers, per_host_limit=args.per_host)
+        total = 0
+        for result, inserted, ignored in handle_scraping(urls, links_model, articles_model, engine):
+            if result.error:
+                logger.warning("%s failed: %s", result.url, result.error)
+            elif result.not_modified:
+                logger.info("%s unchanged", result.url)
+            else:
+                logger.info("%s: %d new, %d duplicates, %d skipped",
+                            result.url, inserted, ignored, result.skipped)
+            logger.debug("%s stages: %s", result.url,
+                         ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in result.timings.items()))
+            total += inserted
+        return total
+    finally:
+        links_model.close_conn()
+        articles_model.close_conn()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Refresh article sources in the background.")
+    parser.add_argument('--once', action='store_true', help="run a single pass and exit")
+    parser.add_argument('--interval', type=float, default=REFRESH_INTERVAL,
+                        help="seconds between refreshes of a source without its own interval")
+    parser.add_argument('--jitter', type=float, default=REFRESH_JITTER,
+                        help="random +/- fraction applied to each source's interval")
+    parser.add_argument('--tick', type=float, default=REFRESH_TICK,
+                        help="seconds between checks for due sources")
+    parser.add_argument('--workers', type=int, default=INGEST_MAX_WORKERS)
+    parser.add_argument('--per-host', type=int, default=INGEST_PER_HOST_LIMIT)
+    parser.add_argument('--metrics-file', default=str(METRICS_EXPORT_PATH),
+                        help="file the metrics are written to after each pass "
+                             "(JSON for .json, Prometheus text otherwise; empty to disable)")
+    parser.add_argument('--thumbnails', type=int, default=THUMBNAIL_BATCH_SIZE,
+                        help="most thumbnails queued after a pass that saved articles (0 to disable)")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    first_pass = True
+    while not stop.is_set():
+        inserted = 0
+        try:
+            inserted = refresh_once(args)
+            if inserted:
+                logger.info("Saved %d new articles", inserted)
+        except Exception:
+            logger.exception("Refresh pass failed")
+        # Only new articles need thumbnails, plus a catch-up on start and
+        # whatever the previous batch had no room for
+        thumbnailer = get_thumbnailer()
+        if args.thumbnails and (inserted or first_pass or thumbnailer.fill_behind):
+            try:
+                made = thumbnailer.fill(args.thumbnails, THUMBNAIL_PASS_TIMEOUT)
+                if made:
+                    logger.info("Made %d thumbnails", made)
+            except Exception:
+                logger.exception("Thumbnail pass failed")
+        if args.metrics_file:
+            try:
+                metrics.export(args.metrics_file)
+            except Exception:
+                logger.exception("Writing metrics to %s failed", args.metrics_file)
+        first_pass = False
+        if args.once:
+            break
+        stop.wait(args.tick)
+
+
+if __name__ == "__main__":
+    main()
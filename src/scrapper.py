@@ -1,8 +1,19 @@
 #!/usr/bin/env python3
 
-import streamlit as st
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
 import agentql
-from playwright.sync_api import sync_playwright
+from playwright.async_api import Page, async_playwright
+
+from config import (SCRAPER_BROWSER_CONTEXTS, SCRAPER_DEFAULT_WAIT, SCRAPER_RUN_TIMEOUT,
+                    SCRAPER_SOURCE_WAITS, SCRAPER_WAIT_TIMEOUT)
+
+logger = logging.getLogger(__name__)
 
 ARTICLES_QUERY = """
 {
@@ -15,16 +26,165 @@ ARTICLES_QUERY = """
 }
 """
 
-def scrapper_articles(url):
-    with sync_playwright() as playwright, playwright.chromium.launch(headless=True) as browser:
-        # Create a new page in the browser and wrap it get access to the AgentQL's querying API
-        page = agentql.wrap(browser.new_page())
-        page.goto(url)
+SELECTOR_WAIT_PREFIX = 'selector:'
+
+
+def wait_for_source(url: str) -> str:
+    """Wait strategy configured for a URL's host, or the default one."""
+    parts = url.split('/')
+    host = parts[2] if len(parts) > 2 else ''
+    return SCRAPER_SOURCE_WAITS.get(host, SCRAPER_DEFAULT_WAIT)
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every scrape.
+
+    Playwright runs on its own event loop thread and callers on any thread
+    block on the result of their page. A fixed set of browser contexts is
+    created once and reused across URLs, so at most `size` pages render in
+    parallel and nothing is launched per URL.
+    """
+
+    def __init__(self, size: int = SCRAPER_BROWSER_CONTEXTS, headless: bool = True) -> None:
+        self.size = max(1, size)
+        self.headless = headless
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever,
+                                            name='browser-pool', daemon=True)
+            self._thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._launch(), self._loop).result()
+            except Exception:
+                # Leave the pool startable again, e.g. after installing browsers
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._thread = None
+                raise
+
+    async def _launch(self) -> None:
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        except Exception:
+            await self._playwright.stop()
+            raise
+        self._contexts: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.size):
+            self._contexts.put_nowait(await self._browser.new_context())
+
+    def run(self, url: str, extract: Callable[[Page], Awaitable[Any]],
+            wait: Optional[str] = None) -> Any:
+        """
+        Open a URL in a pooled context and run an extraction on the page.
+
+        Args:
+            url: Page to open; file:// and localhost URLs work too
+            extract: Coroutine function receiving the loaded page
+            wait: 'load', 'domcontentloaded', 'networkidle' or 'selector:<css>'
+                  (defaults to the source's configured wait)
+
+        Returns:
+            Whatever extract returns
+
+        Raises:
+            TimeoutError: When the page is not done within SCRAPER_RUN_TIMEOUT
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(url, extract, wait or wait_for_source(url)), self._loop
+        )
+        try:
+            return future.result(timeout=SCRAPER_RUN_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f'{url} took longer than {SCRAPER_RUN_TIMEOUT}s') from None
+
+    async def _run(self, url: str, extract: Callable[[Page], Awaitable[Any]], wait: str) -> Any:
+        context = await self._contexts.get()
+        page = None
+        try:
+            page = await context.new_page()
+            if wait.startswith(SELECTOR_WAIT_PREFIX):
+                await page.goto(url, wait_until='domcontentloaded', timeout=SCRAPER_WAIT_TIMEOUT)
+                await page.wait_for_selector(wait[len(SELECTOR_WAIT_PREFIX):],
+                                             timeout=SCRAPER_WAIT_TIMEOUT)
+            else:
+                await page.goto(url, wait_until=wait, timeout=SCRAPER_WAIT_TIMEOUT)
+            return await extract(page)
+        finally:
+            # The context always goes back to the queue, or the pool runs dry
+            try:
+                if page is None or not await self._close_page(page):
+                    context = await self._replace_context(context)
+            finally:
+                self._contexts.put_nowait(context)
+
+    @staticmethod
+    async def _close_page(page: Page) -> bool:
+        """Close a page; False if that failed or the page (or its context) was already gone."""
+        if page.is_closed():
+            return False
+        try:
+            await page.close()
+            return True
+        except Exception:
+            return False
+
+    async def _replace_context(self, context):
+        """A fresh context for one that failed to open or close a page, or the old one if none can be made."""
+        try:
+            await context.close()
+        except Exception:
+            pass
+        try:
+            return await self._browser.new_context()
+        except Exception:
+            logger.exception("Could not replace a broken browser context")
+            return context
+
+    def fetch_html(self, url: str, wait: Optional[str] = None) -> str:
+        """Rendered HTML of a page."""
+        return self.run(url, lambda page: page.content(), wait)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    async def _shutdown(self) -> None:
+        await self._browser.close()
+        await self._playwright.stop()
+
+
+_browser_pool: Optional[BrowserPool] = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool()
+            atexit.register(_browser_pool.close)
+        return _browser_pool
+
 
-        articles_data = page.query_data(ARTICLES_QUERY)
+async def _query_articles(page: Page) -> dict:
+    return await agentql.wrap_async(page).query_data(ARTICLES_QUERY)
 
-        # Used only for demo purposes. It allows you to see the effect of the script.
-        page.wait_for_timeout(10000)
 
-        st.json(articles_data)
-        return articles_data
\ No newline at end of file
+def scrapper_articles(url, wait=None):
+    return get_browser_pool().run(url, _query_articles, wait)
@@ -0,0 +1,16 @@
+from models.article_model import Articles
+
+def main():
+    articles = None
+    try:
+        articles = Articles()
+        migrated = articles.migrate_image_urls()
+        print(f"Migrated images of {migrated} articles")
+    except Exception as e:
+        print(f"Error migrating article images: {str(e)}")
+    finally:
+        if articles:
+            articles.close_conn()
+
+if __name__ == "__main__":
+    main()
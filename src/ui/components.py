@@ -6,7 +6,10 @@ from typing import Any, Dict, List
 import streamlit as st
 from bs4 import BeautifulSoup
 
-from models.article_model import Articles
+from config import METRICS_EXPORT_PATH
+from models.article_model import ArticleRecord, Articles
+from utils.metrics import QUERY_METRIC, STAGE_METRIC, load_export, metrics
+from utils.thumbnailer import get_thumbnailer
 
 from .linkedin_post_dialog import show_linkedin_post_dialog
 
@@ -109,6 +112,10 @@ def setup_article_styles():
                 background-color: #ff7675;
                 color: #ffffff;
             }
+            .card-thumbnail {
+                width: 100%;
+                margin-bottom: 1rem;
+            }
             /* Add smooth transitions */
             .stButton>button {
                 transition: all 0.3s ease;
@@ -169,8 +176,82 @@ def display_pagination_controls(current_page: int, total_pages: int, total_items
                 st.session_state.current_page = current_page + 1
                 st.rerun()
 
-def display_articles():
-    articles_model = Articles()
+def _histogram_rows(snapshot: Dict[str, Any], name: str, label: str) -> List[Dict[str, Any]]:
+    rows = [
+        {
+            label: histogram["labels"].get(label),
+            **({"method": histogram["labels"]["method"]} if "method" in histogram["labels"] else {}),
+            "count": histogram["count"],
+            "total ms": round(histogram["sum"] * 1000, 1),
+            "p50 ms": round(histogram["p50"] * 1000, 2),
+            "p95 ms": round(histogram["p95"] * 1000, 2),
+            "max ms": round(histogram["max"] * 1000, 2),
+        }
+        for histogram in snapshot["histograms"] if histogram["name"] == name
+    ]
+    return sorted(rows, key=lambda row: row["total ms"], reverse=True)
+
+def display_diagnostics():
+    """Query latencies of this app, and ingest stage timings from the refresh daemon's export."""
+    snapshot = metrics.snapshot()
+
+    st.markdown("**Database queries** (this app)")
+    query_rows = _histogram_rows(snapshot, QUERY_METRIC, "query")
+    if query_rows:
+        st.dataframe(query_rows, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No queries recorded yet.")
+
+    if snapshot["slow_queries"]:
+        st.markdown("**Slow queries**")
+        st.dataframe([
+            {
+                "at": datetime.fromtimestamp(entry["at"]).strftime('%H:%M:%S'),
+                "ms": round(entry["seconds"] * 1000, 1),
+                "method": entry["method"],
+                "query": entry["query"],
+            }
+            for entry in reversed(snapshot["slow_queries"])
+        ], use_container_width=True, hide_index=True)
+
+    st.markdown("**Ingest stages** (refresh daemon)")
+    daemon_snapshot = load_export(METRICS_EXPORT_PATH) if METRICS_EXPORT_PATH.suffix == '.json' else None
+    if daemon_snapshot:
+        st.dataframe(_histogram_rows(daemon_snapshot, STAGE_METRIC, "stage"),
+                     use_container_width=True, hide_index=True)
+        st.dataframe([
+            {"source": source, **{stage: round(seconds * 1000) for stage, seconds in timings.items() if stage != "at"}}
+            for source, timings in sorted(daemon_snapshot["sources"].items())
+        ], use_container_width=True, hide_index=True)
+    else:
+        st.caption(f"No daemon metrics in {METRICS_EXPORT_PATH} yet.")
+
+    json_col, prometheus_col = st.columns(2)
+    for col, fmt, suffix in ((json_col, "JSON", "json"), (prometheus_col, "Prometheus", "prom")):
+        with col:
+            if st.button(f"Export {fmt}", key=f"export_metrics_{suffix}", use_container_width=True):
+                path = metrics.export(METRICS_EXPORT_PATH.with_name(f"metrics_ui.{suffix}"))
+                st.success(f"Written to {path}")
+
+def display_search_results(articles_model: Articles, query: str):
+    results = articles_model.search_articles(query)
+    if not results:
+        st.info("No articles match your search.")
+        return
+
+    thumbnails = get_thumbnailer().lookup(article['primary_image'] for article, _ in results)
+    cols = st.columns(3)
+    for idx, (article, snippet) in enumerate(results):
+        display_article_card(article, cols[idx % 3], "search", articles_model, snippet=snippet,
+                             thumbnail=thumbnails.get(article['primary_image']))
+
+def display_articles(articles_model: Articles):
+    query = st.text_input("Search articles", key="search_query", placeholder="Search titles, descriptions and sources...")
+    collapse_duplicates = st.toggle("Hide duplicate stories", value=True, key="collapse_duplicates",
+                                    help="Show a story reported by several sources only once")
+    if query.strip():
+        display_search_results(articles_model, query)
+        return
 
     # Initialize pagination state
     if "current_page" not in st.session_state:
@@ -191,7 +272,7 @@ def display_articles():
 
             # Get pagination data with filter
             per_page = 12
-            total_articles = articles_model.get_total_filtered_articles(filter_value)
+            total_articles = articles_model.get_total_filtered_articles(filter_value, collapse_duplicates)
             total_pages = math.ceil(total_articles / per_page)
 
             # Reset page if it exceeds the new total pages
@@ -200,26 +281,41 @@ def display_articles():
 
             current_page = st.session_state.current_page
 
+            # Remember where each visited page ends so the next one is a
+            # keyset seek; forget them once the tab's article set changes
+            tab_cursors = st.session_state.setdefault("page_cursors", {}).setdefault(
+                (filter_value, collapse_duplicates), {}
+            )
+            if tab_cursors.get("total") != total_articles:
+                tab_cursors.clear()
+                tab_cursors.update({"total": total_articles, "pages": {}})
+
             # Get filtered and paginated articles
             articles = articles_model.get_filtered_articles(
                 current_page,
                 per_page,
-                filter_value
+                filter_value,
+                cursor=tab_cursors["pages"].get(current_page),
+                collapse_duplicates=collapse_duplicates
             )
+            if articles:
+                tab_cursors["pages"][current_page + 1] = articles[-1]["id"]
 
             # Display articles in grid with 3 columns
             if articles:
+                thumbnails = get_thumbnailer().lookup(article['primary_image'] for article in articles)
                 cols = st.columns(3)
                 for idx, article in enumerate(articles):
-                    display_article_card(article, cols[idx % 3], filter_value)
+                    display_article_card(article, cols[idx % 3], filter_value, articles_model,
+                                         thumbnail=thumbnails.get(article['primary_image']))
 
                 # Display pagination controls with total items
                 display_pagination_controls(current_page, total_pages, total_articles, per_page, filter_value)
             else:
                 st.info("No articles found for the selected filter.")
 
-def display_article_card(record: Dict[str, Any], col, filter_value: str):
-    articles_model = Articles()
+def display_article_card(record: ArticleRecord, col, filter_value: str, articles_model: Articles,
+                         snippet: str = None, thumbnail: str = None):
 
     with col:
         with st.container(border=True):
@@ -246,8 +342,12 @@ def display_article_card(record: Dict[str, Any], col, filter_value: str):
                 formatted_date = date_obj.strftime('%B %d, %Y')
                 st.markdown(f"<div style='padding-top: 5px;'>{formatted_date}</div>", unsafe_allow_html=True)
 
-            if record['image_urls']:
-                st.image(record['image_urls'], use_column_width=True)
+            # Local thumbnails are served statically and cached by the browser;
+            # the remote image is only used until the thumbnail is made
+            if thumbnail:
+                st.markdown(f'<img src="{thumbnail}" class="card-thumbnail" alt="">', unsafe_allow_html=True)
+            elif record['primary_image']:
+                st.image(record['primary_image'], use_column_width=True)
 
             st.subheader(record['title'], anchor=None)
             st.markdown(
@@ -258,7 +358,9 @@ def display_article_card(record: Dict[str, Any], col, filter_value: str):
             )
 
             description = record['description']
-            if description:
+            if snippet:
+                st.markdown(snippet)
+            elif description:
                 # Parse the description HTML and extract the first paragraph
                 text_only = BeautifulSoup(description, 'html.parser').getText()
                 # Remove 'Read more' text if it exists
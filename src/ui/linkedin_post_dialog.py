@@ -1,16 +1,46 @@
 import re
-import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import streamlit as st
 
+from models.article_body_model import ArticleBodies
 from models.chat_model import Chat
 from utils.gpt_integration import GPTIntegration, LinkedInPostResponse
 
 
-def get_ai_response(messages: list, article: Dict[str, Any]) -> LinkedInPostResponse:
+def get_ai_response(messages: list, article: Dict[str, Any], body: Optional[str] = None) -> LinkedInPostResponse:
     gpt_integration = GPTIntegration()
-    return gpt_integration.get_ai_response(messages, article)
+    return gpt_integration.get_ai_response(messages, article, body)
+
+def get_article_body(article: Dict[str, Any]) -> Optional[str]:
+    """Article text for the prompt, fetched on the first open and then reused"""
+    bodies = st.session_state.setdefault("article_bodies", {})
+    if article['id'] not in bodies:
+        body_model = ArticleBodies()
+        try:
+            body = body_model.get_body(article['id'])
+            if body is None:
+                with st.spinner("Reading the article..."):
+                    body = body_model.fetch_body(article['id'], article['url'])
+        finally:
+            body_model.close_conn()
+        # A failed fetch is not stored and is retried in the next session
+        bodies[article['id']] = body
+    return bodies[article['id']]
+
+def load_chat_history(chat_model: Chat, article_id: int) -> Dict[str, Any]:
+    """The article's chat history, kept in the session and topped up with chats saved since"""
+    histories = st.session_state.setdefault("chat_histories", {})
+    history = histories.setdefault(article_id, {"last_id": 0, "messages": [], "final_post": ""})
+    for record in chat_model.get_chats_by_article(article_id, after_id=history["last_id"]):
+        if record["user_message"]:
+            history["messages"].append({"role": "user", "content": record["user_message"]})
+        elif record["assistant_message"]:
+            history["messages"].append({"role": "assistant", "content": record["assistant_message"]})
+        if record["generated_post"]:
+            history["final_post"] = record["generated_post"]
+        history["last_id"] = max(history["last_id"], record["id"])
+    return history
 
 def is_rtl(text: str) -> bool:
     """Detect if text contains RTL characters (Arabic, Hebrew, etc)"""
@@ -31,17 +61,14 @@ def show_linkedin_post_dialog(article: Dict[str, Any]):
 
     chat_model = Chat()
     article_id = article.get('id')
+    body = get_article_body(article)
 
     # Initialize chat history and final post
     if article_id:
-        chat_records = chat_model.get_chats_by_article(article_id)
-        st.session_state.chat_history = [
-            {"role": "user", "content": record["user_message"]} if record["user_message"] else
-            {"role": "assistant", "content": record["assistant_message"]}
-            for record in chat_records
-        ]
-        if chat_records:
-            st.session_state.final_post = next((record['generated_post'] for record in reversed(chat_records) if record['generated_post']), '')
+        history = load_chat_history(chat_model, article_id)
+        st.session_state.chat_history = history["messages"]
+        if history["last_id"]:
+            st.session_state.final_post = history["final_post"]
 
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
@@ -58,11 +85,11 @@ def show_linkedin_post_dialog(article: Dict[str, Any]):
     with post_col:
         _generate_post_area(chat_model=chat_model, article_id=article_id)
 
-        _render_chat_interface(article, chat_model, article_id)
+        _render_chat_interface(article, chat_model, article_id, body)
 
     chat_model.close_conn()
 
-def _render_chat_interface(article, chat_model, article_id):
+def _render_chat_interface(article, chat_model, article_id, body):
     st.subheader("Chat with AI")
     messages = st.container(height=400)
 
@@ -72,28 +99,30 @@ def _render_chat_interface(article, chat_model, article_id):
 
     if user_input := st.chat_input("Type your message...", key="chatinput"):
         with messages.chat_message("user"):
-            st.session_state.chat_history.append({"role": "user", "content": user_input})
             st.markdown(user_input)
 
+        # The saved message reaches chat_history through the incremental load
         chat_model.save_chat(article_id=article_id, user_message=user_input)
+        load_chat_history(chat_model, article_id)
 
         with messages.chat_message("assistant"):
-            message = st.empty()
-            with message.status("Thinking..."):
-                st.session_state.chat_history.append(
-                        {"role": "assistant", "content": "I will try to help you!"}
-                    )
-                time.sleep(5)
+            try:
+                stream = GPTIntegration().stream_ai_response(st.session_state.chat_history, article, body)
+                st.write_stream(stream)
+            except Exception as e:
+                st.error(f"Error getting a response: {e}")
+                return
 
-            assistant_message_count = sum(1 for msg in st.session_state.chat_history if msg["role"] == "assistant")
-            st.session_state.final_post = f"""🔍 {'قراءة ممتعة' if assistant_message_count % 2 == 0 else 'Enjoyable Read'}: {article['title']}"""
+            response = stream.response
+            if response.response_type == "post_update" and response.updated_post:
+                st.session_state.final_post = response.updated_post
 
-            message.markdown("I will try to help you!")
             chat_model.save_chat(
                     article_id=article_id,
-                    assistant_message="I will try to help you!",
-                    generated_post=st.session_state.final_post
+                    assistant_message=response.message,
+                    generated_post=response.updated_post
                 )
+            load_chat_history(chat_model, article_id)
 
 def _post_reviewer(article):
     st.markdown("""
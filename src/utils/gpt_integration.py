@@ -1,28 +1,205 @@
+import json
+import logging
 import os
-from typing import Any, Dict, Literal, Optional
+import time
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Type
 from dotenv import load_dotenv
 from openai import OpenAI
 from pydantic import BaseModel
 
+from models.llm_cache_model import LLMCache
+from config import ARTICLE_BODY_PROMPT_CHARS
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4o-mini-2024-07-18"
+TEMPERATURE = 0.7
+
 class LinkedInPostResponse(BaseModel):
     response_type: Literal["chat", "post_update"]
     message: str
     updated_post: Optional[str] = None
 
+class ModelRefusalError(RuntimeError):
+    """The model declined the request instead of giving a structured response"""
+
+class OpenAIBackend:
+    """Structured chat completions from the OpenAI API"""
+
+    def __init__(self, client: Optional[OpenAI] = None) -> None:
+        self.client = client or OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    def complete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 response_format: Type[BaseModel]) -> BaseModel:
+        completion = self.client.beta.chat.completions.parse(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format,
+        )
+        message = completion.choices[0].message
+        if message.refusal or message.parsed is None:
+            raise ModelRefusalError(message.refusal or "The model gave no structured response")
+        return message.parsed
+
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+               response_format: Type[BaseModel]) -> Iterator[str]:
+        """Raw JSON text of the structured response, as the model produces it"""
+        with self.client.beta.chat.completions.stream(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format,
+        ) as stream:
+            refusal = []
+            for event in stream:
+                if event.type == "content.delta":
+                    yield event.delta
+                elif event.type == "refusal.delta":
+                    refusal.append(event.delta)
+        # Raised before the stream completes, so the refusal is never cached
+        if refusal:
+            raise ModelRefusalError("".join(refusal))
+
+class FakeBackend:
+    """
+    Offline backend answering every request with a fixed response.
+
+    Args:
+        respond: Called with the request messages, returns the response model
+    """
+
+    def __init__(self, respond: Callable[[List[Dict[str, str]]], BaseModel]) -> None:
+        self.respond = respond
+        self.calls = 0
+
+    def complete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 response_format: Type[BaseModel]) -> BaseModel:
+        self.calls += 1
+        return self.respond(messages)
+
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+               response_format: Type[BaseModel], chunk_size: int = 8) -> Iterator[str]:
+        content = self.complete(model, messages, temperature, response_format).model_dump_json()
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
+
+class JsonStringFieldReader:
+    """
+    Decodes one string field out of a JSON object that arrives in pieces.
+
+    feed() takes the next piece of raw JSON and returns the newly decoded
+    part of the field's value, so it can be shown before the object is
+    complete. Escapes split across pieces are held back until complete.
+    """
+
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, field: str) -> None:
+        self.opening = json.dumps(field)
+        self.raw = ""
+        self.pos = None  # Index in raw of the next undecoded value character
+        self.done = False
+
+    def feed(self, piece: str) -> str:
+        self.raw += piece
+        if self.done:
+            return ""
+        if self.pos is None:
+            key = self.raw.find(self.opening)
+            if key < 0:
+                return ""
+            start = self.raw.find('"', key + len(self.opening))
+            if start < 0:
+                return ""
+            self.pos = start + 1
+
+        decoded = []
+        raw, pos = self.raw, self.pos
+        while pos < len(raw):
+            char = raw[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != '\\':
+                decoded.append(char)
+                pos += 1
+                continue
+            if pos + 1 >= len(raw):
+                break
+            if raw[pos + 1] != 'u':
+                decoded.append(self._ESCAPES.get(raw[pos + 1], raw[pos + 1]))
+                pos += 2
+                continue
+            # \uXXXX, or a surrogate pair \uXXXX\uXXXX for characters outside the BMP
+            if pos + 6 > len(raw):
+                break
+            width = 12 if 0xD800 <= int(raw[pos + 2:pos + 6], 16) < 0xDC00 else 6
+            if pos + width > len(raw):
+                break
+            decoded.append(json.loads(f'"{raw[pos:pos + width]}"'))
+            pos += width
+        self.pos = pos
+        return "".join(decoded)
+
+class ResponseStream:
+    """
+    Iterates over the reply's message text as it is generated.
+
+    Once iteration finishes, response holds the parsed LinkedInPostResponse.
+    """
+
+    def __init__(self, chunks: Iterator[str], on_complete: Callable[[str], None]) -> None:
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self.response: Optional[LinkedInPostResponse] = None
+        self.time_to_first_token: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        reader = JsonStringFieldReader("message")
+        started = time.perf_counter()
+        for chunk in self._chunks:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - started
+                logger.info("Time to first token: %.0f ms", self.time_to_first_token * 1000)
+            text = reader.feed(chunk)
+            if text:
+                yield text
+
+        self.response = LinkedInPostResponse.model_validate_json(reader.raw)
+        logger.info("Streamed response in %.0f ms", (time.perf_counter() - started) * 1000)
+        self._on_complete(reader.raw)
+
 class GPTIntegration:
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, backend=None, cache: Optional[LLMCache] = None):
+        # A custom backend or cache gets its own instance, the default one is shared
+        if backend is not None or cache is not None:
+            instance = super(GPTIntegration, cls).__new__(cls)
+            instance.backend = backend or OpenAIBackend()
+            instance.cache = cache or LLMCache()
+            return instance
         if cls._instance is None:
             cls._instance = super(GPTIntegration, cls).__new__(cls)
-            cls._instance.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            cls._instance.backend = OpenAIBackend()
+            cls._instance.cache = LLMCache()
         return cls._instance
 
-    def get_ai_response(self, messages: list, article: Dict[str, Any]) -> LinkedInPostResponse:
-        system_message = {
+    def build_system_message(self, article: Dict[str, Any], body: Optional[str] = None) -> Dict[str, str]:
+        if body:
+            source = f"""Article content:
+            {body[:ARTICLE_BODY_PROMPT_CHARS]}
+
+            Use the article content to generate the post."""
+        else:
+            source = "The full article is not available, generate the post based on the provided title and description."
+
+        return {
             "role": "system",
             "content": f"""You are a professional LinkedIn post writer. Help the user create engaging posts about articles they've read.
             Current article:
@@ -30,7 +207,7 @@ class GPTIntegration:
             Description: {article['description']}
             URL: {article['url']}
 
-            First, try to access the URL to get the full content of the article. If you can access the link, use the full content to generate the post. If you cannot access the link, indicate in your response that you were unable to access the link and generate the post based on the provided title and description.
+            {source}
 
             When suggesting post updates, set response_type to "post_update" and include the full post in updated_post.
 
@@ -41,13 +218,45 @@ class GPTIntegration:
             For general chat responses, set response_type to "chat"."""
         }
 
-        api_messages = [system_message] + messages
+    def _prepare(self, messages: list, article: Dict[str, Any], body: Optional[str]):
+        system_message = self.build_system_message(article, body)
+        api_messages = [{"role": m["role"], "content": m["content"]} for m in [system_message] + messages]
 
-        completion = self.client.beta.chat.completions.parse(
-            model="gpt-4o-mini-2024-07-18",
-            messages=[{"role": m["role"], "content": m["content"]} for m in api_messages],
-            temperature=0.7,
-            response_format=LinkedInPostResponse,
+        key = LLMCache.make_key(
+            model=MODEL,
+            temperature=TEMPERATURE,
+            response_format=LinkedInPostResponse.__name__,
+            system=system_message["content"],
+            article={field: article.get(field) for field in ("id", "title", "description", "url")},
+            messages=api_messages[1:],
         )
+        return api_messages, key
+
+    def get_ai_response(self, messages: list, article: Dict[str, Any],
+                        body: Optional[str] = None) -> LinkedInPostResponse:
+        api_messages, key = self._prepare(messages, article, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LinkedInPostResponse.model_validate_json(cached)
+
+        response = self.backend.complete(MODEL, api_messages, TEMPERATURE, LinkedInPostResponse)
+        if response is None:
+            raise ModelRefusalError("The model gave no structured response")
+        self.cache.put(key, response.model_dump_json())
+        return response
+
+    def stream_ai_response(self, messages: list, article: Dict[str, Any],
+                           body: Optional[str] = None) -> ResponseStream:
+        """
+        Like get_ai_response, but yields the reply's message while it is generated
+
+        Iterate the returned stream (e.g. with st.write_stream), then read its
+        response attribute for the parsed LinkedInPostResponse.
+        """
+        api_messages, key = self._prepare(messages, article, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return ResponseStream(iter([cached]), lambda raw: None)
 
-        return completion.choices[0].message.parsed
+        chunks = self.backend.stream(MODEL, api_messages, TEMPERATURE, LinkedInPostResponse)
+        return ResponseStream(chunks, lambda raw: self.cache.put(key, raw))
@@ -0,0 +1,204 @@
+"""
+In-process latency metrics: histograms, a slow-query log and ingest stage timings.
+
+Everything is recorded into the module-level `metrics` registry. Recording
+costs a couple of microseconds (a bisect and a lock), so it stays on for
+every query.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config import METRICS_SLOW_LOG_SIZE, METRICS_SLOW_QUERY_MS
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, as in Prometheus' default buckets plus finer ones for SQLite
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+QUERY_METRIC = 'db_query_seconds'
+STAGE_METRIC = 'ingest_stage_seconds'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS_RE = re.compile(r'\?(?:\s*,\s*\?)+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def query_shape(query: str) -> str:
+    """A query with literals and placeholder lists collapsed, so variants share one histogram."""
+    shape = _STRING_RE.sub('?', query)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _PLACEHOLDERS_RE.sub('?...', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+class Histogram:
+    """Per-bucket counts plus count, sum and max of observed seconds."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip([str(b) for b in BUCKETS] + ['+Inf'], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, slow_query_ms: float = METRICS_SLOW_QUERY_MS,
+                 slow_log_size: int = METRICS_SLOW_LOG_SIZE) -> None:
+        self.slow_query_seconds = slow_query_ms / 1000
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self._sources: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def observe_query(self, query: str, method: str, seconds: float) -> None:
+        """Record a query under its shape, and log it if it was slow."""
+        shape = query_shape(query)
+        self.observe(QUERY_METRIC, seconds, query=shape, method=method)
+        if seconds >= self.slow_query_seconds:
+            logger.warning("Slow query (%.0f ms): %s", seconds * 1000, shape)
+            with self._lock:
+                self._slow_queries.append({
+                    'at': time.time(), 'seconds': seconds, 'method': method, 'query': shape
+                })
+
+    def record_stages(self, source: str, timings: Dict[str, float]) -> None:
+        """Keep a source's latest stage timings and add them to the stage histograms."""
+        for stage, seconds in timings.items():
+            self.observe(STAGE_METRIC, seconds, stage=stage)
+        with self._lock:
+            self._sources[source] = dict(timings, at=time.time())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = [
+                {'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in self._histograms.items()
+            ]
+            return {
+                'generated_at': time.time(),
+                'histograms': histograms,
+                'slow_queries': list(self._slow_queries),
+                'sources': {source: dict(timings) for source, timings in self._sources.items()},
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Histograms in the Prometheus text exposition format."""
+        lines: List[str] = []
+        typed = set()
+        with self._lock:
+            items = sorted(self._histograms.items(), key=lambda item: item[0])
+            for (name, labels), histogram in items:
+                if name not in typed:
+                    lines.append(f'# TYPE {name} histogram')
+                    typed.add(name)
+                label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+                prefix = f'{label_text},' if label_text else ''
+                cumulative = 0
+                for bound, count in zip([str(b) for b in BUCKETS] + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                suffix = f'{{{label_text}}}' if label_text else ''
+                lines.append(f'{name}_sum{suffix} {histogram.total}')
+                lines.append(f'{name}_count{suffix} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: Path) -> Path:
+        """Write the metrics to a file: JSON for a .json suffix, Prometheus text otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = self.to_json() if path.suffix == '.json' else self.to_prometheus()
+        # Replace atomically so readers never see a partial file
+        temp_path = path.with_name(path.name + '.tmp')
+        temp_path.write_text(content, encoding='utf-8')
+        temp_path.replace(path)
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._slow_queries.clear()
+            self._sources.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+@contextmanager
+def stage(timings: Dict[str, float], name: str) -> Iterator[None]:
+    """Add the time spent in the block to timings[name]."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def load_export(path: Path) -> Optional[Dict[str, Any]]:
+    """Snapshot written by another process (e.g. the refresh daemon), or None."""
+    try:
+        return json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+metrics = MetricsRegistry()
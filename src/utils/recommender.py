@@ -0,0 +1,81 @@
+from langchain_openai import ChatOpenAI
+from langchain.prompts import ChatPromptTemplate
+from langchain.schema import StrOutputParser
+from dotenv import load_dotenv
+import os
+
+from models.article_model import Articles, strip_html
+from models.llm_cache_model import LLMCache
+from config import DB_PATH
+
+MODEL = "gpt-4"
+TEMPERATURE = 0.7
+
+SYSTEM_PROMPT = "You are a content strategy expert specialized in identifying content gaps and opportunities."
+USER_PROMPT = """{context}
+            Please analyze these articles and suggest:
+            1. A unique topic for a new article that would complement existing content
+            2. Key points to cover
+            3. Why this topic would be valuable to readers
+
+            Format your response in a structured way with clear headings and bullet points."""
+
+class ContentRecommender:
+    def __init__(self, db_path: str = DB_PATH):
+        # Load environment variables from .env file
+        load_dotenv()
+
+        # Get API key from environment
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+        self.llm = ChatOpenAI(
+            model=MODEL,
+            temperature=TEMPERATURE
+        )  # LangChain will automatically use OPENAI_API_KEY from env
+        self.articles = Articles(db_path)
+        self.cache = LLMCache(db_path)
+
+    def build_context(self, articles) -> str:
+        context = "Based on the following articles:\n\n"
+        for article in articles:
+            favorite = " (favorite)" if article['is_favorite'] else ""
+            context += (f"Title: {article['title']}{favorite}\nSource: {article['source']}\n"
+                        f"Summary: {strip_html(article['description'])[:500]}...\n\n")
+        return context
+
+    def get_recommendation(self):
+        # A bounded sample of recent and favorite articles across sources
+        articles = self.articles.get_context_articles()
+        context = self.build_context(articles)
+
+        # The same sample gives the same recommendation until the cache entry expires
+        key = LLMCache.make_key(
+            model=MODEL,
+            temperature=TEMPERATURE,
+            system=SYSTEM_PROMPT,
+            user=USER_PROMPT,
+            context=context,
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Create prompt template
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT),
+            ("user", USER_PROMPT)
+        ])
+
+        # Create the chain
+        chain = prompt | self.llm | StrOutputParser()
+
+        # Execute the chain
+        recommendation = chain.invoke({"context": context})
+        self.cache.put(key, recommendation)
+
+        return recommendation
+
+    def close_conn(self):
+        self.articles.close_conn()
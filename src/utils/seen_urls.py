@@ -0,0 +1,34 @@
+import hashlib
+import threading
+from typing import Iterable, Optional, Set
+
+
+class SeenUrls:
+    """
+    Compact in-memory set of article URLs that are already stored.
+
+    Keeps 64-bit hashes instead of the URLs themselves, so a million articles
+    cost tens of megabytes rather than the full strings. It is only used to
+    drop known entries early: anything it lets through still goes through
+    INSERT OR IGNORE, so a URL stored by another process is never lost.
+    """
+
+    def __init__(self, urls: Iterable[str] = ()) -> None:
+        self._hashes: Set[int] = set()
+        self._lock = threading.Lock()
+        self.add_many(urls)
+
+    @staticmethod
+    def _hash(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def __contains__(self, url: Optional[str]) -> bool:
+        return bool(url) and self._hash(url) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add_many(self, urls: Iterable[Optional[str]]) -> None:
+        hashes = {self._hash(url) for url in urls if url}
+        with self._lock:
+            self._hashes |= hashes
@@ -0,0 +1,77 @@
+import hashlib
+import re
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def features(text: str) -> List[str]:
+    """Lowercased words and adjacent word pairs of a text."""
+    words = _WORD_RE.findall(text.lower())
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+def simhash_batch(texts: Sequence[str]) -> np.ndarray:
+    """
+    64-bit SimHash of every text, computed together.
+
+    Texts without any words get 0, which callers should treat as "no
+    fingerprint" rather than as a match for each other.
+
+    Returns:
+        uint64 array with one fingerprint per text
+    """
+    token_hashes = {}
+    hashes = []
+    counts = np.zeros(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        tokens = features(text)
+        counts[i] = len(tokens)
+        for token in tokens:
+            if token not in token_hashes:
+                digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+                token_hashes[token] = int.from_bytes(digest, 'little')
+        hashes.extend(map(token_hashes.__getitem__, tokens))
+
+    fingerprints = np.zeros(len(texts), dtype=np.uint64)
+    present = counts > 0
+    if not present.any():
+        return fingerprints
+
+    # One row of 0/1 per token hash, bit i in column i
+    bits = np.unpackbits(np.array(hashes, dtype='<u8').view(np.uint8).reshape(-1, 8),
+                         axis=1, bitorder='little')
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+    ones = np.add.reduceat(bits, offsets, axis=0, dtype=np.int32)
+
+    # A bit is set where most of the text's features have it set
+    majority = (ones * 2 > counts[present, None]).astype(np.uint8)
+    fingerprints[present] = np.packbits(majority, axis=1, bitorder='little').view('<u8').ravel()
+    return fingerprints
+
+
+def bands(fingerprint: int) -> List[int]:
+    """The fingerprint cut into BANDS values of BAND_BITS bits, lowest first."""
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+def distance(a: int, b: int) -> int:
+    """Number of differing bits."""
+    return (a ^ b).bit_count()
+
+
+def to_signed(fingerprints: Iterable[int]) -> List[int]:
+    """Fingerprints as signed 64-bit ints, the range SQLite INTEGER can store."""
+    return [int(value) - (1 << BITS) if int(value) >= 1 << (BITS - 1) else int(value)
+            for value in fingerprints]
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << BITS) - 1)
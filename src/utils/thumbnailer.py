@@ -0,0 +1,241 @@
+"""
+Local thumbnails of article images.
+
+Each primary image is downloaded once, shrunk to card size and written to
+THUMBNAIL_DIR as <content hash>.jpg, where Streamlit's static serving hands
+it to browsers with caching headers instead of every rerun pulling the
+full-size image from its origin. The directory is kept under
+THUMBNAIL_MAX_DISK_BYTES by deleting the least recently used files, going
+by mtime, which is refreshed whenever a card shows a thumbnail.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+from PIL import Image
+
+from config import (DB_PATH, REQUEST_TIMEOUT, THUMBNAIL_DIR, THUMBNAIL_MAX_DISK_BYTES,
+                    THUMBNAIL_MAX_SOURCE_BYTES, THUMBNAIL_QUALITY, THUMBNAIL_SIZE,
+                    THUMBNAIL_URL_PREFIX, THUMBNAIL_WORKERS)
+from models.thumbnail_model import Thumbnails
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+# Access times closer together than this are not written again
+TOUCH_INTERVAL = 3600
+
+
+class Thumbnailer:
+    def __init__(self, db_path: str = DB_PATH, directory: Path = THUMBNAIL_DIR,
+                 max_disk_bytes: int = THUMBNAIL_MAX_DISK_BYTES,
+                 size: Tuple[int, int] = THUMBNAIL_SIZE, workers: int = THUMBNAIL_WORKERS) -> None:
+        self.db_path = db_path
+        self.directory = Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self.size = size
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='thumbnail')
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._fill_after_id: Optional[int] = None  # Newest article fill has already queued
+        self.fill_behind = False  # The last fill hit its limit before the newest article
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, str]:
+        """
+        Static URL of the local thumbnail for each image URL that has one.
+
+        Images without a thumbnail are queued for the background workers, so
+        they are local from a later rerun on. Returned files count as used.
+        """
+        urls = [url for url in urls if url]
+        if not urls:
+            return {}
+        thumbnails = Thumbnails(self.db_path)
+        try:
+            files = thumbnails.get_files(urls)
+            self.schedule(thumbnails.get_pending([url for url in urls if url not in files]))
+        finally:
+            thumbnails.close_conn()
+
+        found = {}
+        now = time.time()
+        for url, file in files.items():
+            path = self.directory / file
+            try:
+                if now - path.stat().st_mtime > TOUCH_INTERVAL:
+                    os.utime(path)
+            except OSError:
+                # Evicted by another process since the lookup
+                continue
+            found[url] = f'{THUMBNAIL_URL_PREFIX}/{file}'
+        return found
+
+    def schedule(self, urls: Iterable[str]) -> List[Future]:
+        """Make thumbnails for urls on the background workers, once per URL; returns the new jobs."""
+        futures = []
+        for url in urls:
+            with self._lock:
+                if url in self._in_flight:
+                    continue
+                self._in_flight.add(url)
+            futures.append(self._pool.submit(self._run, url))
+        return futures
+
+    def fill(self, limit: int, timeout: float) -> int:
+        """
+        Queue thumbnails for articles added since the previous call.
+
+        The first call looks at the newest limit articles. Later calls only
+        read articles above the last one covered, so a pass with nothing new
+        costs one index lookup. Older images that still lack a thumbnail are
+        made when a card first shows them.
+
+        Args:
+            limit: Most thumbnails queued per call
+            timeout: Seconds to wait for them; the rest finish in the background
+
+        Returns:
+            How many thumbnails were made within the timeout
+        """
+        thumbnails = Thumbnails(self.db_path)
+        try:
+            latest_id = thumbnails.get_latest_article_id()
+            if self._fill_after_id is None:
+                self._fill_after_id = max(0, latest_id - limit)
+            rows = thumbnails.get_missing(self._fill_after_id, latest_id, limit)
+        finally:
+            thumbnails.close_conn()
+        # A full batch may stop short of latest_id; the next call picks up there
+        self.fill_behind = len(rows) == limit
+        self._fill_after_id = rows[-1][0] if self.fill_behind else latest_id
+
+        futures = self.schedule(dict.fromkeys(url for _, url in rows))
+        if not futures:
+            return 0
+        done, _ = wait(futures, timeout=timeout)
+        return sum(future.result() is not None for future in done)
+
+    def _run(self, url: str) -> Optional[str]:
+        try:
+            return self.make(url)
+        except Exception:
+            logger.exception("Thumbnail of %s failed", url)
+            return None
+        finally:
+            with self._lock:
+                self._in_flight.discard(url)
+
+    def make(self, url: str) -> Optional[str]:
+        """
+        Download url, store its thumbnail and record it.
+
+        Returns:
+            File name of the thumbnail, or None if the image could not be
+            fetched or decoded
+        """
+        file = None
+        try:
+            data = self._download(url)
+            file = hashlib.sha256(data).hexdigest()[:32] + '.jpg'
+            path = self.directory / file
+            if path.exists():
+                os.utime(path)
+            else:
+                self._write(path, self._resize(data))
+        except (requests.RequestException, OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.info("No thumbnail for %s: %s", url, e)
+            file = None
+
+        thumbnails = Thumbnails(self.db_path)
+        try:
+            thumbnails.save(url, file)
+        finally:
+            thumbnails.close_conn()
+        if file is not None:
+            self.evict()
+        return file
+
+    def _download(self, url: str) -> bytes:
+        with requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            chunks: List[bytes] = []
+            received = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                received += len(chunk)
+                if received > THUMBNAIL_MAX_SOURCE_BYTES:
+                    raise ValueError(f'image larger than {THUMBNAIL_MAX_SOURCE_BYTES} bytes')
+                chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _resize(self, data: bytes) -> bytes:
+        with Image.open(io.BytesIO(data)) as image:
+            # Decode at a reduced scale where the format allows it (JPEG)
+            image.draft('RGB', self.size)
+            image = image.convert('RGB')
+            image.thumbnail(self.size, Image.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+        return output.getvalue()
+
+    def _write(self, path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Replace atomically so the static server never serves a partial file
+        temp_path = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        temp_path.write_bytes(content)
+        temp_path.replace(path)
+
+    def evict(self) -> int:
+        """Delete least recently used thumbnails until the directory fits max_disk_bytes; returns how many."""
+        with self._evict_lock:
+            entries = []
+            try:
+                for entry in os.scandir(self.directory):
+                    if entry.name.endswith('.jpg'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.name))
+            except OSError:
+                return 0
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_disk_bytes:
+                return 0
+
+            evicted = []
+            for _, size, name in sorted(entries):
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    (self.directory / name).unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted.append(name)
+
+        thumbnails = Thumbnails(self.db_path)
+        try:
+            thumbnails.forget_files(evicted)
+        finally:
+            thumbnails.close_conn()
+        logger.info("Evicted %d thumbnails", len(evicted))
+        return len(evicted)
+
+
+_thumbnailer: Optional[Thumbnailer] = None
+_thumbnailer_lock = threading.Lock()
+
+
+def get_thumbnailer() -> Thumbnailer:
+    """The process-wide thumbnailer, so Streamlit reruns share its workers."""
+    global _thumbnailer
+    with _thumbnailer_lock:
+        if _thumbnailer is None:
+            _thumbnailer = Thumbnailer()
+        return _thumbnailer
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The app imports its modules from src, the standalone scripts from the root
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
@@ -0,0 +1,51 @@
+"""BrowserPool against local file:// pages; skipped where Chromium is not installed."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrapper import BrowserPool
+
+PAGE = '<html><head><title>Fixture</title></head><body><article>First post</article></body></html>'
+
+
+@pytest.fixture
+def pool():
+    # One context, so every page after a crash has to use its replacement
+    pool = BrowserPool(size=1)
+    try:
+        pool.start()
+    except Exception as e:
+        pytest.skip(f'Chromium is not available: {e}')
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def page_url(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text(PAGE, encoding='utf-8')
+    return path.as_uri()
+
+
+def test_fetch_html(pool, page_url):
+    assert '<article>First post</article>' in pool.fetch_html(page_url)
+
+
+def test_selector_wait(pool, page_url):
+    assert 'First post' in pool.fetch_html(page_url, wait='selector:article')
+
+
+def test_contexts_are_released(pool, page_url):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pages = list(executor.map(pool.fetch_html, [page_url] * 4))
+    assert all('First post' in html for html in pages)
+
+
+def test_crashed_page_is_replaced(pool, page_url):
+    async def crash(page):
+        await page.context.close()
+        raise RuntimeError('page crashed')
+
+    with pytest.raises(RuntimeError, match='page crashed'):
+        pool.run(page_url, crash)
+    assert 'First post' in pool.fetch_html(page_url)
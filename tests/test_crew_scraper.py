@@ -0,0 +1,122 @@
+"""Chunked crew_scraper extraction against a local stub Ollama server."""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from bs4 import BeautifulSoup
+
+pytest.importorskip('crewai')
+
+import crew_scraper  # noqa: E402
+
+LINK_RE = re.compile(r'<a href="([^"]+)">([^<]+)</a>')
+
+
+class StubOllama(ThreadingHTTPServer):
+    """Answers every generation with the links found in its prompt, as articles."""
+
+    def __init__(self, delay=0.05):
+        super().__init__(('127.0.0.1', 0), StubOllamaHandler)
+        self.delay = delay
+        self.requests = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.running += 1
+            server.max_running = max(server.max_running, server.running)
+        try:
+            # Held open a little, so concurrent chunks overlap
+            time.sleep(server.delay)
+            prompt = body.get('prompt') or ' '.join(str(m.get('content')) for m in body.get('messages', []))
+            articles = [{'title': title, 'description': f'About {title}', 'link': link}
+                        for link, title in LINK_RE.findall(prompt)]
+            answer = f'Thought: I now can give a great answer\nFinal Answer: {json.dumps(articles)}'
+            if self.path.endswith('/api/chat'):
+                reply = {'message': {'role': 'assistant', 'content': answer}}
+            else:
+                reply = {'response': answer}
+            reply.update(model=body.get('model'), created_at='2024-01-01T00:00:00Z', done=True,
+                         done_reason='stop', prompt_eval_count=1, eval_count=1)
+            content = (json.dumps(reply) + '\n').encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson' if body.get('stream') else 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        finally:
+            with server.lock:
+                server.running -= 1
+
+    def do_GET(self):
+        # Model listings and version checks
+        content = json.dumps({'models': [], 'version': '0.0.0'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    server = StubOllama()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(crew_scraper, 'OLLAMA_BASE_URL', server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def listing(count):
+    cards = ''.join(f'<div class="card"><a href="https://example.com/posts/{i}">Post {i}</a>'
+                    f'<p>{"Lorem ipsum dolor sit amet. " * 5}</p></div>' for i in range(count))
+    return BeautifulSoup(f'<main>{cards}</main>', 'html.parser').main
+
+
+def test_chunks_end_on_element_boundaries():
+    content = listing(20)
+    chunks = crew_scraper.chunk_content(content, token_budget=200)
+    assert len(chunks) > 1
+    assert all(crew_scraper.estimate_tokens(chunk) <= 200 for chunk in chunks)
+    assert ''.join(chunks) == ''.join(str(node) for node in content.contents)
+
+
+def test_extracts_chunks_in_parallel(ollama):
+    articles = crew_scraper.extract_articles(listing(20), token_budget=200, max_workers=3)
+
+    assert [article['link'] for article in articles] == [f'https://example.com/posts/{i}' for i in range(20)]
+    assert articles[0] == {'title': 'Post 0', 'description': 'About Post 0',
+                           'link': 'https://example.com/posts/0'}
+    assert ollama.requests > 1
+    assert 1 < ollama.max_running <= 3
+
+
+def test_merge_drops_repeated_links():
+    merged = crew_scraper.merge_articles([
+        [{'title': 'Post 1', 'description': 'Cut', 'link': 'https://example.com/posts/1/'}],
+        [{'title': 'Post 1', 'description': 'Cut across chunks', 'link': 'https://example.com/posts/1'},
+         {'title': 'Post 2', 'description': '', 'link': ''}],
+    ])
+    assert merged == [
+        {'title': 'Post 1', 'description': 'Cut across chunks', 'link': 'https://example.com/posts/1/'},
+        {'title': 'Post 2', 'description': '', 'link': ''},
+    ]
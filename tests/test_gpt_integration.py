@@ -0,0 +1,141 @@
+"""GPTIntegration with its LLM cache, against FakeBackend and a local stub server."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+from models.llm_cache_model import LLMCache
+from utils.gpt_integration import (FakeBackend, GPTIntegration, LinkedInPostResponse, ModelRefusalError,
+                                  OpenAIBackend)
+
+ARTICLE = {'id': 1, 'title': 'Laravel 11 released', 'description': 'What is new', 'url': 'https://example.com/11'}
+MESSAGES = [{'role': 'user', 'content': 'Write a post about it'}]
+REPLY = LinkedInPostResponse(response_type='post_update', message='Here is a "draft" — enjoy',
+                             updated_post='Laravel 11 is out!\n\n#php')
+
+
+class StubChatServer(ThreadingHTTPServer):
+    """Streams REPLY as chat completion chunks of a few characters each."""
+
+    def __init__(self, reply, chunk_size=5):
+        super().__init__(('127.0.0.1', 0), StubChatHandler)
+        self.content = reply.model_dump_json()
+        self.chunk_size = chunk_size
+        self.requests = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1'
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(body)
+        content = self.server.content
+        deltas = [{'role': 'assistant', 'content': ''}]
+        deltas += [{'content': content[i:i + self.server.chunk_size]}
+                   for i in range(0, len(content), self.server.chunk_size)]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for i, delta in enumerate(deltas + [{}]):
+            chunk = {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': 0,
+                'model': body['model'],
+                'choices': [{'index': 0, 'delta': delta,
+                             'finish_reason': 'stop' if i == len(deltas) else None}],
+            }
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+        self.wfile.write(b'data: [DONE]\n\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def chat_server():
+    server = StubChatServer(REPLY)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite'))
+    yield cache
+    cache.close_conn()
+
+
+def test_streams_structured_response(chat_server, cache):
+    client = OpenAI(api_key='test', base_url=chat_server.url)
+    gpt = GPTIntegration(backend=OpenAIBackend(client), cache=cache)
+
+    stream = gpt.stream_ai_response(MESSAGES, ARTICLE)
+    assert ''.join(stream) == REPLY.message
+    assert stream.response == REPLY
+    assert chat_server.requests[0]['stream'] is True
+
+    # The finished stream was cached, so asking again does not reach the server
+    assert gpt.get_ai_response(MESSAGES, ARTICLE) == REPLY
+    assert len(chat_server.requests) == 1
+
+
+def refuse(messages):
+    raise ModelRefusalError("I can't help with that")
+
+
+def counters(cache):
+    stats = cache.stats()
+    return stats['hits'], stats['misses'], stats['entries']
+
+
+def test_cache_hit_and_miss(cache):
+    backend = FakeBackend(lambda messages: REPLY)
+    gpt = GPTIntegration(backend=backend, cache=cache)
+    hits, misses, _ = counters(cache)
+
+    assert gpt.get_ai_response(MESSAGES, ARTICLE) == REPLY
+    assert gpt.get_ai_response(MESSAGES, ARTICLE) == REPLY
+    assert backend.calls == 1
+    assert counters(cache) == (hits + 1, misses + 1, 1)
+
+    # Any change to the request is a different entry
+    other = MESSAGES + [{'role': 'user', 'content': 'Shorter please'}]
+    assert gpt.get_ai_response(other, ARTICLE) == REPLY
+    assert backend.calls == 2
+    assert counters(cache) == (hits + 1, misses + 2, 2)
+
+
+def test_streamed_response_is_cached(cache):
+    backend = FakeBackend(lambda messages: REPLY)
+    gpt = GPTIntegration(backend=backend, cache=cache)
+
+    first = gpt.stream_ai_response(MESSAGES, ARTICLE)
+    assert ''.join(first) == REPLY.message
+    second = gpt.stream_ai_response(MESSAGES, ARTICLE)
+    assert ''.join(second) == REPLY.message
+    assert second.response == REPLY
+    assert backend.calls == 1
+
+
+def test_refusal_raises_and_is_not_cached(cache):
+    backend = FakeBackend(refuse)
+    gpt = GPTIntegration(backend=backend, cache=cache)
+
+    with pytest.raises(ModelRefusalError, match="can't help"):
+        gpt.get_ai_response(MESSAGES, ARTICLE)
+    with pytest.raises(ModelRefusalError):
+        ''.join(gpt.stream_ai_response(MESSAGES, ARTICLE))
+    assert cache.stats()['entries'] == 0
+
+    # Asking again goes back to the model instead of replaying the refusal
+    backend.respond = lambda messages: REPLY
+    assert gpt.get_ai_response(MESSAGES, ARTICLE) == REPLY
+    assert backend.calls == 3